@@ -0,0 +1,94 @@
+"""
+File-backed leaves
+
+Hash files or binary streams incrementally, chunk by chunk, so blobs of any
+size are never fully loaded in memory. The digests are hashed leaves, pass
+them straight to `MerkleTree`.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from os import PathLike
+from typing import BinaryIO, Callable, Iterable, List, Optional, Union
+
+# bytes read per `readinto`
+CHUNK_SIZE = 1024 * 1024
+
+Source = Union[str, PathLike, BinaryIO]
+
+
+def keccak_hasher():
+    """
+    # Incremental keccak-256 with the `update`/`digest` interface of `hashlib`
+
+    `keccak_hasher()` of a blob gives the same digest as the default leaf hash
+    of `MerkleTree` over the same bytes.
+    """
+    from Crypto.Hash import keccak
+
+    return keccak.new(digest_bits=256)
+
+
+def hash_blob(
+    source: Source,
+    hasher: Callable = keccak_hasher,
+    chunk_size: int = CHUNK_SIZE,
+) -> bytes:
+    """
+    # Hash a file path or an open binary stream chunk by chunk
+
+    ## Args:
+        - source: File path or binary stream opened for reading
+        - hasher: Factory of a hash object with `update` and `digest` (e.g. `hashlib.sha256`)
+            * Defaults to `keccak_hasher`
+        - chunk_size: Bytes read at a time
+
+    ## Returns:
+        - Digest of the whole content
+    """
+    if isinstance(source, (str, PathLike)):
+        with open(source, "rb") as stream:
+            return hash_blob(stream, hasher, chunk_size)
+
+    state = hasher()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    while True:
+        size = source.readinto(buffer)
+        if not size:
+            break
+        state.update(view[:size])
+    return state.digest()
+
+
+def hash_blobs(
+    sources: Iterable[Source],
+    hasher: Callable = keccak_hasher,
+    chunk_size: int = CHUNK_SIZE,
+    workers: Optional[int] = None,
+) -> List[bytes]:
+    """
+    # Hash many blobs on a pool of threads
+
+    Reading files and the hash functions of `hashlib` and `pycryptodome` release
+    the GIL, so blobs are hashed in parallel.
+
+    ## Args:
+        - sources: File paths or binary streams
+        - hasher: Factory of a hash object with `update` and `digest`
+            * Defaults to `keccak_hasher`
+        - chunk_size: Bytes read at a time
+        - workers: Number of threads
+            * Defaults to the `ThreadPoolExecutor` default
+
+    ## Returns:
+        - List of digests, in the order of `sources`
+
+    ```python
+    >>> MerkleTree(hash_blobs(["a.pdf", "b.pdf"])).root
+    ```
+    """
+    with ThreadPoolExecutor(workers) as pool:
+        return list(
+            pool.map(partial(hash_blob, hasher=hasher, chunk_size=chunk_size), sources)
+        )
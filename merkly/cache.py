@@ -0,0 +1,223 @@
+"""
+Leaf hash cache
+
+Content-addressed cache of hashed leaves, so rebuilding a tree whose leaves
+mostly did not change only hashes the new ones. It has an in-memory LRU tier
+and an optional SQLite tier on disk with size-based eviction.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+import hashlib
+import sqlite3
+
+from merkly.utils import function_key
+
+# rows per `IN (...)` query, below SQLite's default variable limit
+SQLITE_BATCH = 500
+
+
+def hash_id(hash_function: Callable[[bytes, bytes], bytes]) -> str:
+    """
+    # Name of a hash function in the cache keys, so two functions never share digests
+
+    Module and qualified name, plus the line for lambdas and nested functions.
+    """
+    key = function_key(hash_function)
+    if key is None:
+        code = hash_function.__code__
+        key = (
+            hash_function.__module__,
+            f"{hash_function.__qualname__}:{code.co_firstlineno}",
+        )
+    return ".".join(key)
+
+
+class LeafHashCache:
+    """
+    # 🗃️ Cache of hashed leaves keyed by (namespace, hash function, raw leaf)
+
+    ## Args:
+        - namespace: Name of the cache (e.g. `"keccak"`), part of every key. A
+        `MerkleTree` also puts its `hash_id(hash_function)` in the keys, so trees
+        of other hash functions do not share digests.
+        - capacity: Number of leaves kept in the memory tier
+            * Defaults to `65536`
+        - path: SQLite file of the disk tier
+            * Defaults to `None` (memory only)
+        - max_disk_bytes: Size of the disk tier above which the least recently
+        used leaves are evicted
+            * Defaults to 256 MiB
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        capacity: int = 65536,
+        path: Optional[str] = None,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.namespace: str = namespace
+        self.capacity: int = capacity
+        self.max_disk_bytes: int = max_disk_bytes
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self.__memory: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        self.__prefix: bytes = namespace.encode() + b"\x00"
+        self.__tick: int = 0
+        self.__db: Optional[sqlite3.Connection] = None
+
+        if path is not None:
+            self.__db = sqlite3.connect(path)
+            self.__db.execute(
+                "CREATE TABLE IF NOT EXISTS leaf_hash"
+                " (key BLOB PRIMARY KEY, digest BLOB NOT NULL, used INTEGER NOT NULL)"
+            )
+            self.__db.execute(
+                "CREATE INDEX IF NOT EXISTS leaf_hash_used ON leaf_hash (used)"
+            )
+            row = self.__db.execute("SELECT MAX(used) FROM leaf_hash").fetchone()
+            self.__tick = row[0] or 0
+
+    def __repr__(self) -> str:
+        return (
+            f"LeafHashCache(namespace: {self.namespace}, hit_rate: {self.hit_rate:.2%})"
+        )
+
+    def __len__(self) -> int:
+        return len(self.__memory)
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        # Share of lookups answered by the memory or disk tier
+        """
+        total = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+    def __disk_key(self, key: Tuple[str, bytes]) -> bytes:
+        function, raw = key
+        return hashlib.sha256(
+            self.__prefix + function.encode() + b"\x00" + raw
+        ).digest()
+
+    def __remember(self, key: Tuple[str, bytes], digest: bytes) -> None:
+        self.__memory[key] = digest
+        self.__memory.move_to_end(key)
+        if len(self.__memory) > self.capacity:
+            self.__memory.popitem(last=False)
+
+    def __disk_get(self, keys: List[bytes]) -> Dict[bytes, bytes]:
+        found = {}
+        for i in range(0, len(keys), SQLITE_BATCH):
+            batch = keys[i : i + SQLITE_BATCH]
+            query = "SELECT key, digest FROM leaf_hash WHERE key IN ({})".format(
+                ",".join("?" * len(batch))
+            )
+            found.update(self.__db.execute(query, batch).fetchall())
+        return found
+
+    def __disk_put(self, rows: Dict[bytes, bytes], used: List[bytes]) -> None:
+        self.__tick += 1
+        self.__db.executemany(
+            "INSERT OR REPLACE INTO leaf_hash (key, digest, used) VALUES (?, ?, ?)",
+            [(key, digest, self.__tick) for key, digest in rows.items()],
+        )
+        self.__db.executemany(
+            "UPDATE leaf_hash SET used = ? WHERE key = ?",
+            [(self.__tick, key) for key in used],
+        )
+        self.__evict()
+        self.__db.commit()
+
+    def __evict(self) -> None:
+        page_size = self.__db.execute("PRAGMA page_size").fetchone()[0]
+        while True:
+            pages = self.__db.execute("PRAGMA page_count").fetchone()[0]
+            free = self.__db.execute("PRAGMA freelist_count").fetchone()[0]
+            if (pages - free) * page_size <= self.max_disk_bytes:
+                return
+            count = self.__db.execute("SELECT COUNT(*) FROM leaf_hash").fetchone()[0]
+            if count == 0:
+                return
+            # drop the least recently used tenth
+            self.__db.execute(
+                "DELETE FROM leaf_hash WHERE key IN"
+                " (SELECT key FROM leaf_hash ORDER BY used LIMIT ?)",
+                (max(count // 10, 1),),
+            )
+
+    def hash_leaves(
+        self,
+        raw_leaves: List[bytes],
+        hash_leaf: Callable[[bytes], bytes],
+        function: str = "",
+    ) -> List[bytes]:
+        """
+        # Hash `raw_leaves` with `hash_leaf`, only the leaves not cached are hashed
+
+        ## Args:
+            - raw_leaves: List of encoded raw leaves
+            - hash_leaf: Function that hashes one raw leaf
+            - function: Name of the hash function behind `hash_leaf`, see `hash_id`
+                * Defaults to `""`
+
+        ## Returns:
+            - List of hashed leaves, in the same order
+        """
+        digests: List[Optional[bytes]] = [None] * len(raw_leaves)
+        missing: Dict[Tuple[str, bytes], List[int]] = {}
+        used = set()
+
+        for i, raw in enumerate(raw_leaves):
+            key = (function, raw)
+            digest = self.__memory.get(key)
+            if digest is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                self.__memory.move_to_end(key)
+                used.add(key)
+                digests[i] = digest
+        self.hits += len(raw_leaves) - sum(map(len, missing.values()))
+
+        if self.__db is not None:
+            # memory hits are recent uses too, or the hottest leaves go first on disk
+            used_keys = [self.__disk_key(key) for key in used]
+            keys = {self.__disk_key(key): key for key in missing}
+            found = self.__disk_get(list(keys)) if keys else {}
+            new_rows = {}
+            for disk_key, key in keys.items():
+                digest = found.get(disk_key)
+                if digest is None:
+                    digest = hash_leaf(key[1])
+                    new_rows[disk_key] = digest
+                    self.misses += len(missing[key])
+                else:
+                    self.disk_hits += len(missing[key])
+                self.__remember(key, digest)
+                for i in missing[key]:
+                    digests[i] = digest
+            self.__disk_put(new_rows, used_keys + list(found))
+        else:
+            for key, indexes in missing.items():
+                digest = hash_leaf(key[1])
+                self.misses += len(indexes)
+                self.__remember(key, digest)
+                for i in indexes:
+                    digests[i] = digest
+
+        return digests
+
+    def close(self) -> None:
+        if self.__db is not None:
+            self.__db.close()
+            self.__db = None
@@ -0,0 +1,117 @@
+"""
+Bulk node export and import
+
+Every node of a tree as `(level, index, digest)` rows, in batches for bulk
+inserts into a database, and back to a tree without hashing again.
+"""
+
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple, Type
+
+from merkly.mtree import MerkleTree
+from merkly.padded import PaddedMerkleTree
+
+# (level, index, digest), level 0 are the hashed leaves
+Row = Tuple[int, int, bytes]
+
+LEVEL_ORDER = "level"
+SUBTREE_ORDER = "subtree"
+
+
+def level_order(levels: List[List[bytes]]) -> Iterator[Row]:
+    """
+    # Nodes level by level, from the leaves up to the root
+    """
+    for level, nodes in enumerate(levels):
+        for index, digest in enumerate(nodes):
+            yield (level, index, digest)
+
+
+def subtree_order(levels: List[List[bytes]]) -> Iterator[Row]:
+    """
+    # Nodes in depth-first pre-order from the root, every subtree is contiguous
+    """
+    stack = [(len(levels) - 1, 0)]
+    while stack:
+        level, index = stack.pop()
+        yield (level, index, levels[level][index])
+        if level > 0:
+            lower = levels[level - 1]
+            if 2 * index + 1 < len(lower):
+                stack.append((level - 1, 2 * index + 1))
+            stack.append((level - 1, 2 * index))
+
+
+def export_nodes(
+    tree: MerkleTree, order: str = LEVEL_ORDER, batch_size: int = 1000
+) -> Iterator[List[Row]]:
+    """
+    # Yield every node of `tree` in batches of rows
+
+    ## Args:
+        - tree: The tree to export
+        - order: `"level"` (`LEVEL_ORDER`) or `"subtree"` (`SUBTREE_ORDER`)
+        - batch_size: Rows per batch
+
+    ## Returns:
+        - Iterator of lists of `(level, index, digest)`
+    """
+    if order == LEVEL_ORDER:
+        rows = level_order(tree.levels)
+    elif order == SUBTREE_ORDER:
+        rows = subtree_order(tree.levels)
+    else:
+        raise ValueError(f"Unknown order: {order}")
+
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_nodes(
+    rows: Iterable[Row], *args, tree_class: Type[MerkleTree] = MerkleTree, **kwargs
+) -> MerkleTree:
+    """
+    # Make a tree from exported rows, in any order, without hashing
+
+    ## Args:
+        - rows: Iterable of `(level, index, digest)`
+        - *args, **kwargs: Arguments of the tree (`hash_function`, ...)
+        - tree_class: Class of the tree
+            * Defaults to `MerkleTree`
+
+    ## Returns:
+        - The tree, with its levels and root already set
+    """
+    levels: List[List[bytes]] = []
+    for level, index, digest in rows:
+        while len(levels) <= level:
+            levels.append([])
+        nodes = levels[level]
+        if index >= len(nodes):
+            nodes.extend([None] * (index + 1 - len(nodes)))
+        nodes[index] = bytes(digest)
+
+    for level, nodes in enumerate(levels):
+        if not nodes or None in nodes:
+            raise ValueError(f"Missing nodes in level {level}")
+    if len(levels[-1]) != 1:
+        raise ValueError("Missing root level")
+    for level, (lower, upper) in enumerate(zip(levels, levels[1:])):
+        # a missing last node would leave no hole, the sizes tell it
+        if len(upper) != (len(lower) + 1) // 2:
+            raise ValueError(f"Missing nodes in level {level} or {level + 1}")
+
+    padded = issubclass(tree_class, PaddedMerkleTree)
+    if not padded and any(len(nodes) == 1 for nodes in levels[:-1]):
+        # only a padded tree hashes a single node with a zero subtree
+        raise ValueError("Levels above a single node level need a PaddedMerkleTree")
+
+    tree = tree_class.from_levels(levels, *args, **kwargs)
+    if padded and len(levels) - 1 != tree.depth:
+        raise ValueError(
+            f"{len(levels) - 1} levels above the leaves, need {tree.depth}"
+        )
+    return tree
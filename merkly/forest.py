@@ -0,0 +1,184 @@
+"""
+Sharded Merkle Tree
+
+The leaves are split in aligned shards of `shard_size` (a power of 2) leaves,
+each shard root is a node of the full tree, so shards can be built on their
+own workers/machines and a coordinator combines their roots.
+"""
+
+from typing import Callable, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from merkly.mtree import MerkleTree
+from merkly.utils import (
+    PowerOfTwoError,
+    is_power_2,
+    keccak_hash,
+    validate_hash_function,
+)
+from merkly.verify import verify_proof
+
+if TYPE_CHECKING:
+    from merkly.node import Node
+
+
+def shard_ranges(size: int, shard_size: int) -> List[Tuple[int, int]]:
+    """
+    # Split `size` leaves in aligned `[start, end)` shards
+
+    ```python
+    >>> shard_ranges(10, 4)
+    [(0, 4), (4, 8), (8, 10)]
+    ```
+    """
+    if not is_power_2(shard_size):
+        raise PowerOfTwoError(shard_size)
+
+    return [
+        (start, min(start + shard_size, size)) for start in range(0, size, shard_size)
+    ]
+
+
+def shard_root(
+    leaves: Union[List[str], List[bytes]],
+    hash_function: Callable[[bytes, bytes], bytes] = keccak_hash,
+) -> bytes:
+    """
+    # Root of a shard, run it on the worker that owns `leaves`
+
+    A last shard holding a single leaf is just that hashed leaf, `bytes` leaves
+    are already hashed as in `MerkleTree`.
+    """
+    if len(leaves) == 1:
+        if isinstance(leaves[0], bytes):
+            return leaves[0]
+        return hash_function(leaves[0].encode(), bytes())
+    return MerkleTree(leaves, hash_function).root
+
+
+class MerkleForest:
+    """
+    # 🌲 Coordinator of a sharded Merkle Tree
+
+    ## Args:
+        - size: Number of leaves of the full tree
+        - shard_size: Number of leaves of each shard, a power of 2
+        - hash_function (Callable[[bytes, bytes], bytes], optional): Function that hashes the data.
+            * Defaults to `keccak` if not provided
+    """
+
+    def __init__(
+        self,
+        size: int,
+        shard_size: int,
+        hash_function: Callable[[bytes, bytes], bytes] = keccak_hash,
+    ) -> None:
+        validate_hash_function(hash_function)
+        if size < 2:
+            raise Exception("Invalid size, need > 2")
+
+        self.hash_function: Callable[[bytes, bytes], bytes] = hash_function
+        self.size: int = size
+        self.shard_size: int = shard_size
+        self.ranges: List[Tuple[int, int]] = shard_ranges(size, shard_size)
+        self.shard_roots: List[Optional[bytes]] = [None] * len(self.ranges)
+        self.__levels: Optional[List[List[bytes]]] = None
+
+    def __repr__(self) -> str:
+        return f"MerkleForest(size: {self.size}, shard_size: {self.shard_size}, missing: {self.missing})"
+
+    @property
+    def missing(self) -> List[int]:
+        return [i for i, root in enumerate(self.shard_roots) if root is None]
+
+    def shard_of(self, leaf_index: int) -> int:
+        return leaf_index // self.shard_size
+
+    def set_shard(self, index: int, shard: Union[MerkleTree, bytes]) -> None:
+        """
+        # Set (or replace) the root of shard `index`
+
+        ## Args:
+            - index: Shard index
+            - shard: The shard `MerkleTree` or its root, a tree must hash like the
+            forest (same `hash_function`, no `sort_pairs`)
+        """
+        if isinstance(shard, MerkleTree):
+            if shard.hash_function is not self.hash_function or shard.sort_pairs:
+                raise ValueError(
+                    f"Shard {index} must use the hash function of the forest without sort_pairs"
+                )
+            start, end = self.ranges[index]
+            if len(shard.leaves) != end - start:
+                raise ValueError(
+                    f"Shard {index} must have {end - start} leaves, got {len(shard.leaves)}"
+                )
+            shard = shard.root
+
+        self.shard_roots[index] = shard
+        if self.__levels is not None:
+            self.__update_path(index)
+
+    def __up_layer(self, layer: List[bytes]) -> List[bytes]:
+        upper = [
+            self.hash_function(layer[i], layer[i + 1])
+            for i in range(0, len(layer) - 1, 2)
+        ]
+        if len(layer) % 2 == 1:
+            upper.append(layer[-1])
+        return upper
+
+    def __update_path(self, index: int) -> None:
+        # only the nodes above a replaced shard change
+        levels = self.__levels
+        levels[0][index] = self.shard_roots[index]
+        for lower, upper in zip(levels, levels[1:]):
+            left = index & ~1
+            if left + 1 < len(lower):
+                upper[index >> 1] = self.hash_function(lower[left], lower[left + 1])
+            else:
+                upper[index >> 1] = lower[left]
+            index >>= 1
+
+    @property
+    def levels(self) -> List[List[bytes]]:
+        """
+        # Levels above the shards, from the shard roots up to the root
+        """
+        if self.__levels is None:
+            if self.missing:
+                raise ValueError(f"Missing roots of shards: {self.missing}")
+            levels = [list(self.shard_roots)]
+            while len(levels[-1]) > 1:
+                levels.append(self.__up_layer(levels[-1]))
+            self.__levels = levels
+        return self.__levels
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0]
+
+    def proof(self, shard_index: int, shard_proof: List["Node"]) -> List["Node"]:
+        """
+        # Make a global proof from a proof made by the shard `MerkleTree`
+
+        ## Args:
+            - shard_index: Shard index of the leaf
+            - shard_proof: Proof of the leaf in its shard (empty for a single leaf shard)
+
+        ## Returns:
+            - List of Nodes, same as `MerkleTree.proof` over all leaves
+        """
+        from merkly.node import Node, Side
+
+        proof = list(shard_proof)
+        index = shard_index
+        for level in self.levels[:-1]:
+            if index % 2 == 1:
+                proof.append(Node(data=level[index - 1], side=Side.LEFT))
+            elif index + 1 < len(level):
+                proof.append(Node(data=level[index + 1], side=Side.RIGHT))
+            index //= 2
+        return proof
+
+    def verify(self, proof: List["Node"], leaf: Union[str, bytes]) -> bool:
+        return verify_proof(proof, leaf, self.root, self.hash_function)
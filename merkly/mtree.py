@@ -2,18 +2,36 @@
 Merkle Tree Model
 """
 
-from typing import Callable, List
-from functools import reduce
+from typing import Callable, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
 
-from merkly.node import Node, Side
 from merkly.utils import (
     validate_hash_function,
     is_power_2,
-    slice_in_pairs,
-    keccak,
+    keccak_hash,
     half,
+    import_numpy,
     validate_leafs,
 )
+from merkly.verify import verify_cap_proof, verify_proof, verify_sorted_proof
+from merkly import planner
+from merkly.planner import Plan, Strategy
+from merkly.stream import root_from_iter
+
+if TYPE_CHECKING:
+    from merkly.cache import LeafHashCache
+    from merkly.node import Node
+
+
+class _Records(list):
+    """
+    # Leaves made by `MerkleTree.from_buffer`, already validated
+
+    `hashed` tells if the records are hashed leaves or raw data to hash.
+    """
+
+    def __init__(self, records: List[bytes], hashed: bool) -> None:
+        super().__init__(records)
+        self.hashed: bool = hashed
 
 
 class MerkleTree:
@@ -21,83 +39,348 @@ class MerkleTree:
     # 🌳 Merkle Tree implementation
 
     ## Args:
-        - leaves: List of raw data
+        - leaves: List of raw data (`str`) or of already hashed leaves (`bytes`),
+        e.g. from `merkly.blob.hash_blobs`
         - hash_function (Callable[[bytes, bytes], bytes], optional): Function that hashes the data.
             * Defaults to `keccak` if not provided
+        - sort_pairs: Sort each pair before hashing it (commutative hashing),
+        compatible with OpenZeppelin's `MerkleProof`. Proofs are then a plain
+        list of digests without sides.
+            * Defaults to `False`
+        - cache: `LeafHashCache` consulted before hashing each leaf, its digests
+        are kept apart per `hash_function`
+            * Defaults to `None`
+        - cap_height: Publish the `2 ** cap_height` nodes of the level `cap_height`
+        below the root (the Merkle cap) instead of the root, proofs stop at that level
+            * Defaults to `None` (the cap is the root)
+        - strategy: `Strategy` (or whole `Plan`) used to hash the leaves and
+        levels, the chosen plan is kept in `plan`. `Strategy.PROCESS` needs a
+        module level hash function and is only chosen on its own after
+        `merkly.planner.enable_processes()`. STREAMING only changes `root`,
+        proofs still build every level.
+            * Defaults to `None` (chosen by `merkly.planner.plan` from the number
+            of leaves and a one-time calibration, when something is hashed)
     """
 
     def __init__(
         self,
-        leaves: List[str],
-        hash_function: Callable[[bytes, bytes], bytes] = lambda x, y: keccak(x + y),
+        leaves: Union[List[str], List[bytes]],
+        hash_function: Callable[[bytes, bytes], bytes] = keccak_hash,
+        sort_pairs: bool = False,
+        cache: Optional["LeafHashCache"] = None,
+        cap_height: Optional[int] = None,
+        strategy: Optional[Union[Strategy, Plan]] = None,
     ) -> None:
-        validate_leafs(leaves)
+        if not isinstance(leaves, _Records):
+            validate_leafs(leaves)
         validate_hash_function(hash_function)
+        if cap_height is not None and cap_height < 0:
+            raise ValueError("Cap height must be >= 0")
+        self.cap_height: Optional[int] = cap_height
         self.hash_function: Callable[[bytes, bytes], bytes] = hash_function
+        self.sort_pairs: bool = sort_pairs
+        self.cache: Optional["LeafHashCache"] = cache
+        self.strategy: Optional[Union[Strategy, Plan]] = strategy
+        self._plan: Optional[Plan] = None
         self.raw_leaves: List[str] = leaves
         self.leaves: List[str] = self.__hash_leaves(leaves)
         self.short_leaves: List[str] = self.short(self.leaves)
 
-    def __hash_leaves(self, leaves: List[str]) -> List[str]:
-        return list(map(lambda x: self.hash_function(x.encode(), bytes()), leaves))
+    @classmethod
+    def from_levels(cls, levels: List[List[bytes]], *args, **kwargs) -> "MerkleTree":
+        """
+        # Make a tree from its levels without hashing
+
+        ## Args:
+            - levels: Every level of the tree, from the hashed leaves up to the root
+            - *args, **kwargs: Other arguments of the tree (`hash_function`, ...)
+        """
+        tree = cls(levels[0], *args, **kwargs)
+        tree._levels = levels
+        tree._root = levels[-1][0]
+        return tree
+
+    @classmethod
+    def from_buffer(
+        cls,
+        buffer,
+        *args,
+        width: Optional[int] = None,
+        hashed: bool = True,
+        **kwargs,
+    ) -> "MerkleTree":
+        """
+        # Make a tree from a buffer of fixed-width records
+
+        Works with any object of the buffer protocol: NumPy `S32` or `uint8[n, 32]`
+        arrays, Arrow fixed-size binary buffers, `bytes`... The records are sliced
+        from a `memoryview` of the buffer, without `str` leaves to encode and
+        validate. Raw records are hashed like raw leaves (`cache`, `strategy`).
+
+        NumPy `S<n>` records keep their NUL padding: `np.array([b"a", b"bb"])`
+        holds `b"a\\x00"` and `b"bb"`, so with `hashed=False` it does not match
+        `MerkleTree(["a", "bb"])`.
+
+        ## Args:
+            - buffer: The records, C-contiguous
+            - *args, **kwargs: Other arguments of the tree (`hash_function`, ...)
+            - width: Bytes per record
+                * Defaults to the record size of the buffer (`S32`, `uint8[n, 32]`)
+            - hashed: The records are hashed leaves, otherwise they are hashed
+            like raw leaves
+                * Defaults to `True`
+        """
+        view = memoryview(buffer)
+        if width is None:
+            if view.ndim == 2:
+                width = view.shape[1] * view.itemsize
+            elif view.format not in ("B", "b", "c"):
+                width = view.itemsize
+            else:
+                raise ValueError("Record width of the buffer is needed")
+        view = view.cast("B")
+        if view.nbytes % width != 0:
+            raise ValueError(f"Buffer size {view.nbytes} is not a multiple of {width}")
+
+        if view.nbytes < 2 * width:
+            raise Exception("Invalid size, need > 2")
+
+        records = [view[i : i + width].tobytes() for i in range(0, view.nbytes, width)]
+        return cls(_Records(records, hashed), *args, **kwargs)
+
+    def __hash_leaves(self, leaves: Union[List[str], List[bytes]]) -> List[bytes]:
+        if isinstance(leaves, _Records):
+            if leaves.hashed:
+                return list(leaves)
+            raw = list(leaves)
+        elif isinstance(leaves[0], bytes):
+            return list(leaves)
+        else:
+            raw = [x.encode() for x in leaves]
+
+        if self.cache is not None:
+            from merkly.cache import hash_id
+
+            return self.cache.hash_leaves(
+                raw,
+                lambda x: self.hash_function(x, bytes()),
+                hash_id(self.hash_function),
+            )
+        return planner.hash_leaves(self.plan, self.hash_function, raw)
+
+    def __getstate__(self) -> dict:
+        # the leaf hash cache holds a database connection, it stays with the process
+        state = self.__dict__.copy()
+        state["cache"] = None
+        return state
 
     def __repr__(self) -> str:
         return f"""MerkleTree(\nraw_leaves: {self.raw_leaves}\nleaves: {self.leaves}\nshort_leaves: {self.short(self.leaves)})"""
 
+    @property
+    def plan(self) -> Plan:
+        """
+        # How the leaves and levels are hashed, chosen on first use
+
+        A tree made with `from_levels` hashes nothing, so it never plans.
+        """
+        if self._plan is None:
+            self._plan = planner.plan(
+                len(self.raw_leaves), self.hash_function, self.strategy
+            )
+        return self._plan
+
     def short(self, data: List[str]) -> List[str]:
         return [x[:2] for x in data]
 
     @property
-    def root(self) -> bytes:
-        return self.make_root(self.leaves)
+    def leaves(self) -> List[bytes]:
+        return self._leaves
 
-    def proof(self, raw_leaf: str) -> List[Node]:
-        return self.make_proof(
-            self.leaves, [], self.hash_function(raw_leaf.encode(), bytes())
-        )
+    @leaves.setter
+    def leaves(self, leaves: List[bytes]) -> None:
+        # the cached root and levels are only valid for the leaves they were made from
+        self._leaves = leaves
+        self._root = None
+        self._levels = None
 
-    def verify(self, proof: List[bytes], raw_leaf: str) -> bool:
-        full_proof = [self.hash_function(raw_leaf.encode(), bytes())]
-        full_proof.extend(proof)
-
-        def concat_nodes(left: Node, right: Node) -> Node:
-            if isinstance(left, Node) is not True:
-                start_node = left
-                if right.side == Side.RIGHT:
-                    data = self.hash_function(start_node, right.data)
-                    return Node(data=data, side=Side.LEFT)
-                else:
-                    data = self.hash_function(right.data, start_node)
-                    return Node(data=data, side=Side.RIGHT)
+    @property
+    def root(self) -> bytes:
+        if self._root is None:
+            if self.plan.strategy == Strategy.STREAMING and self._levels is None:
+                # only the O(log n) frontier is kept, not a whole level
+                self._root = root_from_iter(self.leaves, self.hash_nodes)
             else:
-                if right.side == Side.RIGHT:
-                    data = self.hash_function(left.data, right.data)
-                    return Node(data=data, side=Side.LEFT)
-                else:
-                    data = self.hash_function(right.data, left.data)
-                    return Node(data=data, side=Side.RIGHT)
+                self._root = self.make_root(self.leaves)
+        return self._root
+
+    @property
+    def levels(self) -> List[List[bytes]]:
+        """
+        # Every level of the tree, from the leaves up to the root
+        """
+        if self._levels is None:
+            self._levels = self.make_levels(self.leaves)
+        return self._levels
+
+    @property
+    def cap_level(self) -> int:
+        """
+        # Level of the Merkle cap, the root level without `cap_height`
+        """
+        top = len(self.levels) - 1
+        if self.cap_height is None:
+            return top
+        return max(top - self.cap_height, 0)
+
+    @property
+    def cap(self) -> List[bytes]:
+        return self.levels[self.cap_level]
+
+    def cap_index(self, leaf_index: int) -> int:
+        """
+        # Index in `cap` of the node above the leaf at `leaf_index`
+        """
+        return leaf_index >> self.cap_level
+
+    def leaf_index(self, leaf: Union[str, bytes]) -> int:
+        if isinstance(leaf, str):
+            leaf = self.hash_function(leaf.encode(), bytes())
+        try:
+            return self.leaves.index(leaf)
+        except ValueError as err:
+            msg = f"Leaf: {leaf} does not exist in the tree: {self.leaves}"
+            raise ValueError(msg) from err
+
+    def hash_nodes(self, left: bytes, right: bytes) -> bytes:
+        """
+        # Hash two nodes of the tree, sorted first when `sort_pairs` is set
+        """
+        if self.sort_pairs and right < left:
+            return self.hash_function(right, left)
+        return self.hash_function(left, right)
+
+    def proof(self, raw_leaf: Union[str, bytes]) -> Union[List["Node"], List[bytes]]:
+        """
+        # Make the proof of `raw_leaf` from the cached levels
+
+        The levels are hashed once, later proofs (and trees loaded with
+        `from_levels`) hash nothing.
+        """
+        return self.index_proof(self.leaf_index(raw_leaf))
+
+    def verify(
+        self, proof: Union[List["Node"], List[bytes]], leaf: Union[str, bytes]
+    ) -> bool:
+        """
+        # Verify a proof of `leaf` against the root of this tree
+
+        ## Args:
+            - proof: List of Nodes (or digests with `sort_pairs`), as returned by `proof`
+            - leaf: Raw data of the leaf (`str`) or the already hashed leaf (`bytes`)
+        """
+        if self.cap_height is not None:
+            try:
+                index = self.leaf_index(leaf)
+            except ValueError:
+                return False
+            return verify_cap_proof(
+                proof,
+                leaf,
+                self.cap,
+                self.cap_index(index),
+                self.hash_function,
+                self.sort_pairs,
+            )
+        if self.sort_pairs:
+            return verify_sorted_proof(proof, leaf, self.root, self.hash_function)
+        return verify_proof(proof, leaf, self.root, self.hash_function)
+
+    def sibling(self, level: int, index: int) -> Optional["Node"]:
+        """
+        # Sibling of the node at `index` of `level`, `None` when the node is promoted
+        """
+        from merkly.node import Node, Side
+
+        nodes = self.levels[level]
+        if index % 2 == 1:
+            return Node(data=nodes[index - 1], side=Side.LEFT)
+        if index + 1 < len(nodes):
+            return Node(data=nodes[index + 1], side=Side.RIGHT)
+        return None
+
+    def index_proof(self, index: int) -> Union[List["Node"], List[bytes]]:
+        """
+        # Make the proof of the leaf at `index` from the cached levels
+
+        The proof goes up to `cap_level`, the root without `cap_height`.
+        """
+        if not 0 <= index < len(self.leaves):
+            raise IndexError(f"Leaf index {index} out of range")
+
+        path = [self.sibling(level, index >> level) for level in range(self.cap_level)]
+        return self.__path_proof(path)
+
+    def iter_proofs(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[Tuple[int, Union[List["Node"], List[bytes]]]]:
+        """
+        # Yield `(index, proof)` of the leaves from `start` to `stop`, in order
+
+        ## Dev:
+            - the sibling at `level` only changes when `index >> level` does, so
+            each step looks up O(1) new siblings amortized, like incrementing a
+            binary counter, and the rest of the path is reused
 
-        return reduce(concat_nodes, full_proof).data == self.root
+        ## Args:
+            - start: First leaf index
+            - stop: Leaf index to stop before
+                * Defaults to the number of leaves
+        """
+        size = len(self.leaves)
+        stop = size if stop is None else min(stop, size)
+        depth = self.cap_level
+        path: List[Optional["Node"]] = [None] * depth
+        previous = None
+
+        for index in range(max(start, 0), stop):
+            if previous is None:
+                changed = depth
+            else:
+                changed = min((index ^ previous).bit_length(), depth)
+            for level in range(changed):
+                path[level] = self.sibling(level, index >> level)
+            previous = index
+            yield index, self.__path_proof(path)
+
+    def __path_proof(
+        self, path: List[Optional["Node"]]
+    ) -> Union[List["Node"], List[bytes]]:
+        if self.sort_pairs:
+            return [node.data for node in path if node is not None]
+        return [node for node in path if node is not None]
 
     def make_root(self, leaves: List[bytes]) -> bytes:
         if len(leaves) == 0:
             raise ValueError("Cannot get root of an empty tree")
 
         while len(leaves) > 1:
-            next_level = []
-            for i in range(0, len(leaves) - 1, 2):
-                next_level.append(self.hash_function(leaves[i], leaves[i + 1]))
+            leaves = self.up_layer(leaves)
 
-            if len(leaves) % 2 == 1:
-                next_level.append(leaves[-1])
+        return leaves[0]
 
-            leaves = next_level
+    def make_levels(self, leaves: List[bytes]) -> List[List[bytes]]:
+        if len(leaves) == 0:
+            raise ValueError("Cannot get root of an empty tree")
 
-        return leaves[0]
+        levels = [leaves]
+        while len(levels[-1]) > 1:
+            levels.append(self.up_layer(levels[-1]))
+        return levels
 
     def make_proof(
-        self, leaves: List[bytes], proof: List[Node], leaf: bytes
-    ) -> List[Node]:
+        self, leaves: List[bytes], proof: List["Node"], leaf: bytes
+    ) -> List["Node"]:
         """
         # Make a proof
 
@@ -113,6 +396,7 @@ class MerkleTree:
         ## Returns:
             - List of Nodes representing the proof
         """
+        from merkly.node import Node, Side
 
         try:
             index = leaves.index(leaf)
@@ -141,8 +425,10 @@ class MerkleTree:
             return self.make_proof(right, proof, leaf)
 
     def mix_tree(
-        self, leaves: List[bytes], proof: List[Node], leaf_index: int
-    ) -> List[Node]:
+        self, leaves: List[bytes], proof: List["Node"], leaf_index: int
+    ) -> List["Node"]:
+        from merkly.node import Node, Side
+
         if len(leaves) == 1:
             return proof
 
@@ -157,13 +443,11 @@ class MerkleTree:
         return self.mix_tree(self.up_layer(leaves), proof, leaf_index // 2)
 
     def up_layer(self, leaves: List[bytes]) -> List[bytes]:
-        new_layer = []
-        for pair in slice_in_pairs(leaves):
-            if len(pair) == 1:
-                new_layer.append(pair[0])
-            else:
-                data = self.hash_function(pair[0], pair[1])
-                new_layer.append(data)
+        new_layer = planner.hash_pairs(
+            self.plan, self.hash_function, self.sort_pairs, leaves
+        )
+        if len(leaves) % 2 == 1:
+            new_layer.append(leaves[-1])
         return new_layer
 
     @property
@@ -174,8 +458,30 @@ class MerkleTree:
     def human_short_leaves(self) -> List[str]:
         return [leaf.hex() for leaf in self.short_leaves]
 
+    def level_array(self, level: int = 0):
+        """
+        # A level as a NumPy `uint8[n, digest_size]` array (needs `numpy`)
+
+        Level `0` are the hashed leaves, level `-1` is the root.
+        """
+        np = import_numpy()
+        nodes = self.levels[level]
+        return np.frombuffer(b"".join(nodes), dtype=np.uint8).reshape(len(nodes), -1)
+
+    def root_array(self):
+        """
+        # The root as a NumPy `uint8[digest_size]` array (needs `numpy`)
+        """
+        np = import_numpy()
+        return np.frombuffer(self.root, dtype=np.uint8)
+
     @staticmethod
-    def verify_proof(proof: List[Node], raw_leaf: str, root: str, **kwargs) -> bool:
+    def verify_proof(
+        proof: List["Node"],
+        raw_leaf: Union[str, bytes],
+        root: Union[str, bytes],
+        **kwargs,
+    ) -> bool:
         """
         Verify the validity of a Merkle proof for a given leaf against the expected root hash.
 
@@ -186,14 +492,17 @@ class MerkleTree:
         Args:
             proof (List[Node]): A list of Nodes representing the Merkle proof. Each Node
                 contains the hash of a sibling node and its position (left or right) in the tree.
-            raw_leaf (str): The raw leaf data (in string format) for which the proof is
-                being verified. This data should correspond to a leaf in the Merkle tree.
-            root (str): The expected root hash (in hexadecimal string format) that the
-                proof should reconstruct if valid.
+            raw_leaf (str | bytes): The raw leaf data (in string format) for which the proof is
+                being verified, or the already hashed leaf (in bytes). This data should
+                correspond to a leaf in the Merkle tree.
+            root (str | bytes): The expected root hash (in bytes or hexadecimal string format)
+                that the proof should reconstruct if valid.
             **kwargs: Optional keyword arguments. Can include:
                 - hash_function (Callable[[bytes, bytes], bytes]): A custom hash function
                   that takes two byte inputs and returns a hash. If not provided,
                   the default `keccak` function is used.
+                - sort_pairs (bool): Verify a proof of a `sort_pairs` tree, where the
+                  proof is a list of digests.
 
         Returns:
             bool: Returns True if the proof is valid and reconstructs the expected root
@@ -204,30 +513,11 @@ class MerkleTree:
             leaf = "a"
             root = "0xe35e6e14fdf91ecc6adfb74856bcd8a2c22544bd10bded94f2a9fecc77cf630b"
             is_valid = MerkleTree.verify_proof(proof, leaf, root)
+
+        Note:
+            To verify without importing `pydantic` use `merkly.verify.verify_proof`
         """
-        if not kwargs.get("hash_function", None):
-            hash_function: Callable[[bytes, bytes], bytes] = lambda x, y: keccak(x + y)
-        else:
-            hash_function = kwargs["hash_function"]
-
-        full_proof = [hash_function(raw_leaf.encode(), bytes())]
-        full_proof.extend(proof)
-
-        def concat_nodes(left: Node, right: Node) -> Node:
-            if isinstance(left, Node) is not True:
-                start_node = left
-                if right.side == Side.RIGHT:
-                    data = hash_function(start_node, right.data)
-                    return Node(data=data, side=Side.LEFT)
-                else:
-                    data = hash_function(right.data, start_node)
-                    return Node(data=data, side=Side.RIGHT)
-            else:
-                if right.side == Side.RIGHT:
-                    data = hash_function(left.data, right.data)
-                    return Node(data=data, side=Side.LEFT)
-                else:
-                    data = hash_function(right.data, left.data)
-                    return Node(data=data, side=Side.RIGHT)
-
-        return reduce(concat_nodes, full_proof).data.hex() == root
+        hash_function = kwargs.get("hash_function", None)
+        if kwargs.get("sort_pairs", False):
+            return verify_sorted_proof(proof, raw_leaf, root, hash_function)
+        return verify_proof(proof, raw_leaf, root, hash_function)
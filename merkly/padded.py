@@ -0,0 +1,129 @@
+"""
+Fixed-depth Merkle Tree
+
+The tree is padded to `2 ** depth` leaves with a zero leaf. The hash of every
+all-zero subtree is precomputed once per (hash function, zero leaf), so the
+padding costs O(depth) hashes and every proof has exactly `depth` siblings.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from merkly.mtree import MerkleTree
+from merkly.utils import function_key, keccak_hash
+
+if TYPE_CHECKING:
+    from merkly.node import Node
+
+# (function key, zero leaf) -> (hash function, hash of the all-zero subtree of each height)
+ZERO_HASHES: Dict[
+    Tuple[Tuple[str, str], bytes], Tuple[Callable[[bytes, bytes], bytes], List[bytes]]
+] = {}
+
+
+def zero_hashes(
+    depth: int, zero_leaf: bytes, hash_function: Callable[[bytes, bytes], bytes]
+) -> List[bytes]:
+    """
+    # Hashes of the all-zero subtrees of height 0 to `depth`
+
+    Cached for module level hash functions only, see `merkly.utils.function_key`.
+
+    ```python
+    >>> zero_hashes(2, b"0", lambda x, y: x + y)
+    [b'0', b'00', b'0000']
+    ```
+    """
+    key = function_key(hash_function)
+    cached = [zero_leaf]
+    if key is not None:
+        function, hashes = ZERO_HASHES.get((key, zero_leaf), (None, None))
+        # a redefined function under the same name replaces the entry
+        if function is hash_function:
+            cached = hashes
+        else:
+            ZERO_HASHES[(key, zero_leaf)] = (hash_function, cached)
+
+    while len(cached) <= depth:
+        cached.append(hash_function(cached[-1], cached[-1]))
+    return cached[: depth + 1]
+
+
+class PaddedMerkleTree(MerkleTree):
+    """
+    # 🧱 Merkle Tree of a fixed depth, padded with a zero leaf
+
+    ## Args:
+        - leaves: List of raw data
+        - hash_function (Callable[[bytes, bytes], bytes], optional): Function that hashes the data.
+            * Defaults to `keccak` if not provided
+        - depth: Depth of the tree, it holds up to `2 ** depth` leaves
+            * Defaults to the smallest depth that holds `leaves`
+        - zero_leaf: Hashed leaf used as padding
+            * Defaults to 32 zero bytes
+        - **kwargs: Other `MerkleTree` arguments (`sort_pairs`, `cache`, `strategy`)
+    """
+
+    def __init__(
+        self,
+        leaves: List[str],
+        hash_function: Callable[[bytes, bytes], bytes] = keccak_hash,
+        depth: Optional[int] = None,
+        zero_leaf: bytes = bytes(32),
+        **kwargs,
+    ) -> None:
+        if depth is None:
+            depth = (len(leaves) - 1).bit_length()
+        if len(leaves) > 2**depth:
+            raise ValueError(f"{len(leaves)} leaves do not fit in depth {depth}")
+
+        self.depth: int = depth
+        self.zero_leaf: bytes = zero_leaf
+        super().__init__(leaves, hash_function, **kwargs)
+        self.zero_hashes: List[bytes] = zero_hashes(depth, zero_leaf, hash_function)
+
+    def __repr__(self) -> str:
+        return f"PaddedMerkleTree(depth: {self.depth}, leaves: {len(self.leaves)})"
+
+    def make_levels(self, leaves: List[bytes]) -> List[List[bytes]]:
+        """
+        # Levels holding the nodes that are not all-zero subtrees
+        """
+        if len(leaves) == 0:
+            raise ValueError("Cannot get root of an empty tree")
+
+        levels = [leaves]
+        for zero in self.zero_hashes[:-1]:
+            level = levels[-1]
+            if len(level) % 2 == 1:
+                level = level + [zero]
+            levels.append(self.up_layer(level))
+        return levels
+
+    def make_root(self, leaves: List[bytes]) -> bytes:
+        return self.make_levels(leaves)[-1][0]
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0]
+
+    def proof(self, leaf: Union[str, bytes]) -> Union[List["Node"], List[bytes]]:
+        """
+        # Make the proof of `leaf`, always `depth` siblings long (`depth - cap_height` with a cap)
+
+        ## Args:
+            - leaf: Raw data of the leaf (`str`) or the already hashed leaf (`bytes`)
+        """
+        return self.index_proof(self.leaf_index(leaf))
+
+    def sibling(self, level: int, index: int) -> Optional["Node"]:
+        """
+        # Sibling of the node at `index` of `level`, an all-zero subtree past the leaves
+        """
+        from merkly.node import Node, Side
+
+        nodes = self.levels[level]
+        sibling = index ^ 1
+        data = nodes[sibling] if sibling < len(nodes) else self.zero_hashes[level]
+        if index % 2 == 1:
+            return Node(data=data, side=Side.LEFT)
+        return Node(data=data, side=Side.RIGHT)
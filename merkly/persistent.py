@@ -0,0 +1,219 @@
+"""
+Persistent Merkle Tree
+
+Every commit creates a new version that shares all unchanged subtrees with
+the previous one, so a changed leaf costs O(log n) new nodes. Versions are
+immutable: snapshots can be read from many threads while a writer commits.
+"""
+
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from merkly.utils import (
+    keccak_hash,
+    slice_in_pairs,
+    validate_hash_function,
+    validate_leafs,
+)
+from merkly.verify import verify_proof
+
+if TYPE_CHECKING:
+    from merkly.node import Node
+
+# (digest, left, right), leaves have no children and a node promoted from an
+# odd level has no right child, same layout as `MerkleTree.up_layer`
+Branch = Tuple[bytes, Optional["Branch"], Optional["Branch"]]
+
+
+class Snapshot:
+    """
+    # 📸 Immutable version of a `PersistentMerkleTree`
+    """
+
+    __slots__ = ("version", "size", "depth", "hash_function", "_top")
+
+    def __init__(
+        self,
+        version: int,
+        size: int,
+        depth: int,
+        top: Branch,
+        hash_function: Callable[[bytes, bytes], bytes],
+    ) -> None:
+        self.version = version
+        self.size = size
+        self.depth = depth
+        self.hash_function = hash_function
+        self._top = top
+
+    def __repr__(self) -> str:
+        return f"Snapshot(version: {self.version}, root: {self.root.hex()})"
+
+    @property
+    def root(self) -> bytes:
+        return self._top[0]
+
+    def __walk(self, index: int) -> List[Tuple[Branch, int]]:
+        if not 0 <= index < self.size:
+            raise IndexError(f"Leaf index {index} out of range for size {self.size}")
+
+        path = []
+        node = self._top
+        for level in range(self.depth, 0, -1):
+            bit = (index >> (level - 1)) & 1
+            path.append((node, bit))
+            node = node[1 + bit]
+        path.append((node, 0))
+        return path
+
+    def leaf(self, index: int) -> bytes:
+        return self.__walk(index)[-1][0][0]
+
+    def proof(self, index: int) -> List["Node"]:
+        """
+        # Make the proof of the leaf at `index`, same as `MerkleTree.proof`
+        """
+        from merkly.node import Node, Side
+
+        proof = []
+        for node, bit in reversed(self.__walk(index)[:-1]):
+            if bit:
+                proof.append(Node(data=node[1][0], side=Side.LEFT))
+            elif node[2] is not None:
+                proof.append(Node(data=node[2][0], side=Side.RIGHT))
+        return proof
+
+    def verify(self, proof: List["Node"], leaf: Union[str, bytes]) -> bool:
+        return verify_proof(proof, leaf, self.root, self.hash_function)
+
+
+class PersistentMerkleTree:
+    """
+    # 🗂️ Versioned Merkle Tree with structural sharing
+
+    ## Args:
+        - leaves: List of raw data
+        - hash_function (Callable[[bytes, bytes], bytes], optional): Function that hashes the data.
+            * Defaults to `keccak` if not provided
+        - retain: How many of the newest versions to keep, older versions are
+        dropped on commit and their unshared nodes garbage collected.
+            * Defaults to `None` (keep every version)
+    """
+
+    def __init__(
+        self,
+        leaves: List[str],
+        hash_function: Callable[[bytes, bytes], bytes] = keccak_hash,
+        retain: Optional[int] = None,
+    ) -> None:
+        validate_leafs(leaves)
+        validate_hash_function(hash_function)
+        if retain is not None and retain < 1:
+            raise ValueError("Must retain at least 1 version")
+
+        self.hash_function: Callable[[bytes, bytes], bytes] = hash_function
+        self.retain: Optional[int] = retain
+        self.size: int = len(leaves)
+        self.__lock = Lock()
+
+        layer: List[Branch] = [(self.__hash_leaf(leaf), None, None) for leaf in leaves]
+        depth = 0
+        while len(layer) > 1:
+            layer = [self.__join(*pair) for pair in slice_in_pairs(layer)]
+            depth += 1
+
+        self.depth: int = depth
+        self.__latest: Snapshot = Snapshot(0, self.size, depth, layer[0], hash_function)
+        self.__versions: Dict[int, Snapshot] = {0: self.__latest}
+
+    def __repr__(self) -> str:
+        return f"PersistentMerkleTree(size: {self.size}, versions: {self.versions})"
+
+    def __hash_leaf(self, leaf: Union[str, bytes]) -> bytes:
+        if isinstance(leaf, str):
+            return self.hash_function(leaf.encode(), bytes())
+        return leaf
+
+    def __join(self, left: Branch, right: Optional[Branch] = None) -> Branch:
+        if right is None:
+            return (left[0], left, None)
+        return (self.hash_function(left[0], right[0]), left, right)
+
+    def __set(self, node: Branch, level: int, index: int, leaf: bytes) -> Branch:
+        if level == 0:
+            return (leaf, None, None)
+        if (index >> (level - 1)) & 1:
+            return self.__join(node[1], self.__set(node[2], level - 1, index, leaf))
+        return self.__join(self.__set(node[1], level - 1, index, leaf), node[2])
+
+    @property
+    def version(self) -> int:
+        return self.__latest.version
+
+    @property
+    def versions(self) -> List[int]:
+        return sorted(self.__versions)
+
+    @property
+    def root(self) -> bytes:
+        return self.__latest.root
+
+    def commit(self, updates: Dict[int, Union[str, bytes]]) -> Snapshot:
+        """
+        # Commit a new version
+
+        ## Args:
+            - updates: Leaf index to its new raw data (`str`) or hashed leaf (`bytes`)
+
+        ## Returns:
+            - Snapshot of the new version
+        """
+        for index in updates:
+            if not 0 <= index < self.size:
+                raise IndexError(
+                    f"Leaf index {index} out of range for size {self.size}"
+                )
+
+        with self.__lock:
+            top = self.__latest._top
+            for index, leaf in updates.items():
+                top = self.__set(top, self.depth, index, self.__hash_leaf(leaf))
+
+            snapshot = Snapshot(
+                self.__latest.version + 1,
+                self.size,
+                self.depth,
+                top,
+                self.hash_function,
+            )
+            self.__versions[snapshot.version] = snapshot
+            self.__latest = snapshot
+            if self.retain is not None:
+                self.__prune(self.retain)
+            return snapshot
+
+    def snapshot(self, version: Optional[int] = None) -> Snapshot:
+        """
+        # Get the immutable snapshot of `version`, the latest one by default
+        """
+        if version is None:
+            return self.__latest
+        try:
+            return self.__versions[version]
+        except KeyError as err:
+            raise KeyError(f"Version {version} is not retained") from err
+
+    def prune(self, keep: int) -> None:
+        """
+        # Drop every version but the `keep` newest ones
+
+        Snapshots already handed out stay valid while they are referenced.
+        """
+        if keep < 1:
+            raise ValueError("Must retain at least 1 version")
+        with self.__lock:
+            self.__prune(keep)
+
+    def __prune(self, keep: int) -> None:
+        for version in sorted(self.__versions)[:-keep]:
+            del self.__versions[version]
@@ -0,0 +1,421 @@
+"""
+Execution planner
+
+Choose how the leaves and levels of a tree are hashed (serial, threads,
+processes or streaming) from the number of leaves and a one-time local
+calibration: the hash cost and the speedup of chunks of pairs sent through
+the pools of workers. Processes are only started after `enable_processes()`
+(or with `MerkleTree(..., strategy=Strategy.PROCESS)`) and need a module level
+hash function. Decisions are logged on the `merkly.planner` logger and can be
+overridden with `MerkleTree(..., strategy=...)`.
+
+Only leaf and level hashing follow the plan. Proofs, `iter_proofs` and verify
+read the levels without hashing them again, and STREAMING only changes `root`:
+`levels`, `cap` and the proofs still build every level.
+"""
+
+from enum import Enum
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+    TYPE_CHECKING,
+)
+import os
+import time
+
+from merkly.utils import function_key, keccak_hash
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+# below this many leaves the serial path is used without calibrating
+SERIAL_LIMIT = 4096
+# smallest number of pairs (or leaves) sent to a worker at a time
+MIN_CHUNK = 1024
+# time spent measuring the hash function
+CALIBRATION_SECONDS = 0.02
+# calibrations kept, the oldest is dropped first
+CALIBRATION_LIMIT = 64
+# memory of one node in the levels: digest, bytes object and list slot
+NODE_BYTES = 100
+
+
+class Strategy(Enum):
+    SERIAL = "serial"
+    THREADED = "threaded"
+    PROCESS = "process"
+    STREAMING = "streaming"
+
+
+class Calibration(NamedTuple):
+    hash_seconds: float
+    thread_speedup: float
+    cores: int
+    # measured only once processes are enabled
+    spawn_seconds: Optional[float] = None
+    process_speedup: Optional[float] = None
+
+
+class Plan(NamedTuple):
+    strategy: Strategy
+    workers: int
+    chunk_size: int
+    reason: str
+
+
+CALIBRATIONS: Dict[Hashable, Calibration] = {}
+EXECUTORS: Dict[Tuple[Strategy, int], "Executor"] = {}
+# worker processes are only started once enabled, see `enable_processes`
+PROCESSES = False
+
+
+def enable_processes(enabled: bool = True) -> None:
+    """
+    # Let the planner start worker processes on its own (PROCESS strategy)
+
+    Off by default: with the `spawn` start method (macOS, Windows) the workers
+    import `__main__` again, so call it under `if __name__ == "__main__":`.
+    """
+    global PROCESSES
+    PROCESSES = enabled
+
+
+def log(message: str, *args) -> None:
+    # `logging` is imported on first use, it is not needed to import `merkly`
+    import logging
+
+    logging.getLogger(__name__).debug(message, *args)
+
+
+def cores() -> int:
+    return os.cpu_count() or 1
+
+
+def available_memory() -> Optional[int]:
+    """
+    # Available physical memory in bytes, `None` when the platform does not say
+
+    `MemAvailable` of `/proc/meminfo` counts the page cache that can be reclaimed,
+    the free pages are only a fallback.
+    """
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def is_picklable(hash_function: Callable[[bytes, bytes], bytes]) -> bool:
+    import pickle
+
+    try:
+        pickle.dumps(hash_function)
+    except Exception:
+        return False
+    return True
+
+
+def calibration_key(hash_function: Callable[[bytes, bytes], bytes]) -> Hashable:
+    # lambdas made again for each tree share the calibration of their code
+    return function_key(hash_function) or hash_function.__code__
+
+
+def noop(_: object = None) -> None:
+    return None
+
+
+def calibration_chunk(hash_seconds: float) -> List[bytes]:
+    # up to `MIN_CHUNK` pairs, as many as hash in `CALIBRATION_SECONDS`
+    pairs = int(min(max(CALIBRATION_SECONDS / max(hash_seconds, 1e-9), 8), MIN_CHUNK))
+    return [bytes(32)] * (2 * pairs)
+
+
+def speedup(
+    pool: "Executor",
+    hash_function: Callable[[bytes, bytes], bytes],
+    chunk: List[bytes],
+    serial: float,
+    workers: int,
+) -> float:
+    # one chunk per worker through the pool the plan uses, round trips included
+    start = time.perf_counter()
+    list(
+        pool.map(
+            hash_pairs_chunk,
+            [hash_function] * workers,
+            [False] * workers,
+            [chunk] * workers,
+        )
+    )
+    return serial * workers / (time.perf_counter() - start)
+
+
+def calibrate(
+    hash_function: Callable[[bytes, bytes], bytes] = keccak_hash,
+) -> Calibration:
+    """
+    # Measure `hash_function` alone and through the pools of workers, once per function
+
+    Chunks of pairs are hashed as `hash_pairs` does, so the dispatch cost of a
+    chunk is part of the speedups. Worker processes are measured (start-up and
+    chunk round trips) only when `enable_processes` was called.
+    """
+    key = calibration_key(hash_function)
+    calibration = CALIBRATIONS.get(key)
+    measured = calibration is None
+    if measured:
+        calibration = measure_threads(hash_function)
+    if (
+        PROCESSES
+        and calibration.process_speedup is None
+        and calibration.cores > 1
+        and is_picklable(hash_function)
+    ):
+        calibration = measure_processes(hash_function, calibration)
+        measured = True
+
+    if measured:
+        log("calibrated %s: %s", getattr(hash_function, "__name__", ""), calibration)
+        CALIBRATIONS.pop(key, None)
+        if len(CALIBRATIONS) >= CALIBRATION_LIMIT:
+            del CALIBRATIONS[next(iter(CALIBRATIONS))]
+        CALIBRATIONS[key] = calibration
+    return calibration
+
+
+def measure_threads(hash_function: Callable[[bytes, bytes], bytes]) -> Calibration:
+    node = bytes(32)
+    start = time.perf_counter()
+    for _ in range(8):
+        hash_function(node, node)
+    chunk = calibration_chunk((time.perf_counter() - start) / 8)
+
+    start = time.perf_counter()
+    hash_pairs_chunk(hash_function, False, chunk)
+    serial = time.perf_counter() - start
+    hash_seconds = serial / (len(chunk) // 2)
+
+    workers = cores()
+    thread_speedup = 1.0
+    if workers > 1:
+        pool = executor(Plan(Strategy.THREADED, workers, MIN_CHUNK, "calibration"))
+        list(pool.map(noop, range(workers)))
+        thread_speedup = speedup(pool, hash_function, chunk, serial, workers)
+    return Calibration(hash_seconds, thread_speedup, workers)
+
+
+def measure_processes(
+    hash_function: Callable[[bytes, bytes], bytes], calibration: Calibration
+) -> Calibration:
+    chunk = calibration_chunk(calibration.hash_seconds)
+    serial = calibration.hash_seconds * (len(chunk) // 2)
+    workers = calibration.cores
+
+    # the pool is kept, later builds do not pay the start-up again
+    start = time.perf_counter()
+    pool = executor(Plan(Strategy.PROCESS, workers, MIN_CHUNK, "calibration"))
+    list(pool.map(noop, range(workers)))
+    spawn_seconds = time.perf_counter() - start
+    process_speedup = speedup(pool, hash_function, chunk, serial, workers)
+    return calibration._replace(
+        spawn_seconds=spawn_seconds, process_speedup=process_speedup
+    )
+
+
+def plan(
+    size: int,
+    hash_function: Callable[[bytes, bytes], bytes] = keccak_hash,
+    strategy: Optional[Union[Strategy, Plan]] = None,
+    calibration: Optional[Calibration] = None,
+    memory: Optional[int] = None,
+) -> Plan:
+    """
+    # Choose how to hash a tree of `size` leaves
+
+    ## Args:
+        - size: Number of leaves
+        - hash_function: Function that hashes the data
+        - strategy: A `Strategy` or a whole `Plan` to use instead of choosing,
+        PROCESS is only chosen on its own after `enable_processes`
+        - calibration: Measures to use instead of `calibrate(hash_function)`
+        - memory: Available memory in bytes
+            * Defaults to `available_memory()`
+
+    ## Returns:
+        - The `Plan`, its `reason` says why it was chosen
+
+    ## Raises:
+        - ValueError: PROCESS with a hash function that cannot be pickled
+    """
+    if isinstance(strategy, Plan):
+        chosen = strategy
+    elif strategy == Strategy.PROCESS and cores() < 2:
+        chosen = Plan(Strategy.SERIAL, 1, size, "forced process, only 1 core")
+    elif strategy is not None:
+        workers = 1 if strategy in (Strategy.SERIAL, Strategy.STREAMING) else cores()
+        chunk_size = max(size // (workers * 4), MIN_CHUNK)
+        chosen = Plan(strategy, workers, chunk_size, "forced")
+    elif size < SERIAL_LIMIT:
+        chosen = Plan(Strategy.SERIAL, 1, size, f"{size} leaves < {SERIAL_LIMIT}")
+    else:
+        chosen = choose(size, hash_function, calibration, memory)
+
+    if chosen.strategy == Strategy.PROCESS and not is_picklable(hash_function):
+        raise ValueError(
+            "Hash function cannot be pickled to worker processes, "
+            "use a module level function"
+        )
+
+    log("plan of %d leaves: %s", size, chosen)
+    return chosen
+
+
+def choose(
+    size: int,
+    hash_function: Callable[[bytes, bytes], bytes],
+    calibration: Optional[Calibration],
+    memory: Optional[int],
+) -> Plan:
+    if memory is None:
+        memory = available_memory()
+    if memory is not None and 2 * size * NODE_BYTES > memory:
+        return Plan(
+            Strategy.STREAMING, 1, size, f"levels need more than {memory} bytes"
+        )
+
+    if calibration is None:
+        calibration = calibrate(hash_function)
+
+    # about one hash per leaf and one per inner node
+    serial = 2 * size * calibration.hash_seconds
+    estimates = {Strategy.SERIAL: (serial, 1)}
+    if calibration.cores > 1 and calibration.thread_speedup > 1.2:
+        estimates[Strategy.THREADED] = (
+            serial / calibration.thread_speedup,
+            calibration.cores,
+        )
+    if (
+        PROCESSES
+        and calibration.process_speedup is not None
+        and calibration.process_speedup > 1.2
+        and is_picklable(hash_function)
+    ):
+        running = (Strategy.PROCESS, calibration.cores) in EXECUTORS
+        spawn = 0.0 if running else calibration.spawn_seconds or 0.0
+        estimates[Strategy.PROCESS] = (
+            spawn + serial / calibration.process_speedup,
+            calibration.cores,
+        )
+
+    strategy = min(estimates, key=lambda key: estimates[key][0])
+    seconds, workers = estimates[strategy]
+    chunk_size = max(size // (workers * 4), MIN_CHUNK)
+    reason = f"estimated {seconds:.3f}s, serial {serial:.3f}s"
+    return Plan(strategy, workers, chunk_size, reason)
+
+
+def executor(chosen: Plan) -> "Executor":
+    """
+    # Pool of workers of a plan, kept to be reused by the next builds
+    """
+    key = (chosen.strategy, chosen.workers)
+    if key not in EXECUTORS:
+        if not EXECUTORS:
+            import atexit
+
+            atexit.register(shutdown)
+        if chosen.strategy == Strategy.PROCESS:
+            from concurrent.futures import ProcessPoolExecutor
+
+            EXECUTORS[key] = ProcessPoolExecutor(chosen.workers)
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            EXECUTORS[key] = ThreadPoolExecutor(chosen.workers)
+    return EXECUTORS[key]
+
+
+def shutdown() -> None:
+    """
+    # Stop the kept pools of workers, done at exit
+    """
+    while EXECUTORS:
+        _, pool = EXECUTORS.popitem()
+        pool.shutdown()
+
+
+def is_parallel(chosen: Plan, size: int) -> bool:
+    return (
+        chosen.strategy in (Strategy.THREADED, Strategy.PROCESS)
+        and size >= 2 * chosen.chunk_size
+    )
+
+
+def hash_leaves_chunk(
+    hash_function: Callable[[bytes, bytes], bytes], leaves: List[bytes]
+) -> List[bytes]:
+    return [hash_function(leaf, bytes()) for leaf in leaves]
+
+
+def hash_pairs_chunk(
+    hash_function: Callable[[bytes, bytes], bytes], sort_pairs: bool, nodes: List[bytes]
+) -> List[bytes]:
+    if sort_pairs:
+        return [
+            hash_function(*sorted((nodes[i], nodes[i + 1])))
+            for i in range(0, len(nodes) - 1, 2)
+        ]
+    return [hash_function(nodes[i], nodes[i + 1]) for i in range(0, len(nodes) - 1, 2)]
+
+
+def hash_leaves(
+    chosen: Plan, hash_function: Callable[[bytes, bytes], bytes], leaves: List[bytes]
+) -> List[bytes]:
+    """
+    # Hash encoded raw leaves as the plan says
+    """
+    if not is_parallel(chosen, len(leaves)):
+        return hash_leaves_chunk(hash_function, leaves)
+
+    size = chosen.chunk_size
+    chunks = [leaves[i : i + size] for i in range(0, len(leaves), size)]
+    hashed = executor(chosen).map(
+        hash_leaves_chunk, [hash_function] * len(chunks), chunks
+    )
+    return [leaf for chunk in hashed for leaf in chunk]
+
+
+def hash_pairs(
+    chosen: Plan,
+    hash_function: Callable[[bytes, bytes], bytes],
+    sort_pairs: bool,
+    nodes: List[bytes],
+) -> List[bytes]:
+    """
+    # Hash the pairs of a level as the plan says, a last odd node is left out
+    """
+    if not is_parallel(chosen, len(nodes) // 2):
+        return hash_pairs_chunk(hash_function, sort_pairs, nodes)
+
+    size = 2 * chosen.chunk_size
+    chunks = [nodes[i : i + size] for i in range(0, len(nodes) - 1, size)]
+    hashed = executor(chosen).map(
+        hash_pairs_chunk,
+        [hash_function] * len(chunks),
+        [sort_pairs] * len(chunks),
+        chunks,
+    )
+    return [node for chunk in hashed for node in chunk]
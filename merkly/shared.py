@@ -0,0 +1,155 @@
+"""
+Shared memory levels
+
+Put the levels of a built tree in one `multiprocessing.shared_memory` block,
+so many proof serving processes attach to a single copy. Pickling a
+`SharedLevels` only sends the name of the block.
+"""
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional, Union, TYPE_CHECKING
+import os
+import struct
+import sys
+
+from merkly.mtree import MerkleTree
+from merkly.padded import PaddedMerkleTree
+
+if TYPE_CHECKING:
+    from merkly.node import Node
+
+# digest size, sort pairs, number of levels, cap level, then the size of each level
+HEADER = struct.Struct("<IBII")
+SIZE = struct.Struct("<Q")
+
+
+class SharedLevels:
+    """
+    # 🧠 Levels of a `MerkleTree` in shared memory
+
+    Use `SharedLevels.create(tree)` in the owner process, `SharedLevels.attach(name)`
+    (or unpickle it) in the workers.
+    """
+
+    def __init__(self, memory: SharedMemory, owner: bool = False) -> None:
+        self.memory: SharedMemory = memory
+        self.owner: bool = owner
+
+        digest_size, sort_pairs, count, cap_level = HEADER.unpack_from(memory.buf, 0)
+        self.digest_size: int = digest_size
+        self.sort_pairs: bool = bool(sort_pairs)
+        self.cap_level: int = cap_level
+        self.sizes: List[int] = [
+            SIZE.unpack_from(memory.buf, HEADER.size + SIZE.size * i)[0]
+            for i in range(count)
+        ]
+        self.offsets: List[int] = []
+        offset = HEADER.size + SIZE.size * count
+        for size in self.sizes:
+            self.offsets.append(offset)
+            offset += size * digest_size
+
+    @classmethod
+    def create(cls, tree: MerkleTree, name: Optional[str] = None) -> "SharedLevels":
+        """
+        # Copy the levels of `tree` into a new shared memory block
+
+        ## Args:
+            - tree: The tree, all its digests must have the same size
+            - name: Name of the block
+                * Defaults to a random name
+        """
+        if isinstance(tree, PaddedMerkleTree):
+            raise ValueError("Zero subtrees of a PaddedMerkleTree are not stored")
+
+        levels = tree.levels
+        digest_size = len(levels[0][0])
+        if any(len(digest) != digest_size for level in levels for digest in level):
+            raise ValueError("Digests of the tree must have the same size")
+
+        start = HEADER.size + SIZE.size * len(levels)
+        total = start + digest_size * sum(len(level) for level in levels)
+        memory = SharedMemory(name=name, create=True, size=total)
+
+        HEADER.pack_into(
+            memory.buf, 0, digest_size, tree.sort_pairs, len(levels), tree.cap_level
+        )
+        for i, level in enumerate(levels):
+            SIZE.pack_into(memory.buf, HEADER.size + SIZE.size * i, len(level))
+            end = start + digest_size * len(level)
+            memory.buf[start:end] = b"".join(level)
+            start = end
+
+        return cls(memory, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedLevels":
+        """
+        # Attach to the block `name` made by `create`, in any process
+
+        The block stays owned by its creator: it is not tracked here, so exiting
+        this process does not free it.
+        """
+        if sys.version_info >= (3, 13):
+            return cls(SharedMemory(name=name, track=False))
+
+        memory = SharedMemory(name=name)
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister(memory._name, "shared_memory")
+        return cls(memory)
+
+    def __reduce__(self):
+        return (SharedLevels.attach, (self.name,))
+
+    def __repr__(self) -> str:
+        return f"SharedLevels(name: {self.name}, sizes: {self.sizes})"
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def node(self, level: int, index: int) -> bytes:
+        start = self.offsets[level] + index * self.digest_size
+        return bytes(self.memory.buf[start : start + self.digest_size])
+
+    @property
+    def root(self) -> bytes:
+        return self.node(len(self.sizes) - 1, 0)
+
+    def index_proof(self, index: int) -> Union[List["Node"], List[bytes]]:
+        """
+        # Make the proof of the leaf at `index`, same as `MerkleTree.index_proof`
+
+        The proof goes up to `cap_level`, the root without `cap_height`.
+        """
+        from merkly.node import Node, Side
+
+        if not 0 <= index < self.sizes[0]:
+            raise IndexError(f"Leaf index {index} out of range")
+
+        proof = []
+        for level, size in enumerate(self.sizes[: self.cap_level]):
+            if index % 2 == 1:
+                proof.append(Node(data=self.node(level, index - 1), side=Side.LEFT))
+            elif index + 1 < size:
+                proof.append(Node(data=self.node(level, index + 1), side=Side.RIGHT))
+            index //= 2
+
+        if self.sort_pairs:
+            return [node.data for node in proof]
+        return proof
+
+    def close(self) -> None:
+        """
+        # Detach this process, the owner also frees the block
+        """
+        self.memory.close()
+        if self.owner:
+            if sys.version_info < (3, 13) and os.name == "posix":
+                # an `attach` sharing this process' tracker may have unregistered it
+                from multiprocessing import resource_tracker
+
+                resource_tracker.register(self.memory._name, "shared_memory")
+            self.memory.unlink()
@@ -0,0 +1,115 @@
+"""
+SQLite node store
+
+Reference adapter of `merkly.export`: mirror trees into a SQLite table so other
+services can answer proofs with SQL, and load them back without hashing.
+"""
+
+from typing import List, Union, TYPE_CHECKING
+import sqlite3
+
+from merkly.export import LEVEL_ORDER, export_nodes, import_nodes
+from merkly.mtree import MerkleTree
+
+if TYPE_CHECKING:
+    from merkly.node import Node
+
+
+class SQLiteNodeStore:
+    """
+    # 🗄️ Trees stored as `(tree, level, idx, digest)` rows
+
+    ## Args:
+        - database: Path of the SQLite file or an open connection
+        - table: Name of the table
+            * Defaults to `"merkle_node"`
+    """
+
+    def __init__(
+        self, database: Union[str, sqlite3.Connection], table: str = "merkle_node"
+    ) -> None:
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+
+        if isinstance(database, sqlite3.Connection):
+            self.connection = database
+        else:
+            self.connection = sqlite3.connect(database)
+        self.table: str = table
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " tree TEXT NOT NULL, level INTEGER NOT NULL, idx INTEGER NOT NULL,"
+            " digest BLOB NOT NULL, PRIMARY KEY (tree, level, idx)"
+            ") WITHOUT ROWID"
+        )
+
+    def __repr__(self) -> str:
+        return f"SQLiteNodeStore(table: {self.table})"
+
+    def save(
+        self,
+        name: str,
+        tree: MerkleTree,
+        order: str = LEVEL_ORDER,
+        batch_size: int = 10000,
+    ) -> None:
+        """
+        # Replace the tree `name` with every node of `tree`
+        """
+        with self.connection:
+            self.connection.execute(f"DELETE FROM {self.table} WHERE tree = ?", (name,))
+            for batch in export_nodes(tree, order, batch_size):
+                self.connection.executemany(
+                    f"INSERT INTO {self.table} (tree, level, idx, digest)"
+                    " VALUES (?, ?, ?, ?)",
+                    [(name, *row) for row in batch],
+                )
+
+    def load(self, name: str, *args, **kwargs) -> MerkleTree:
+        """
+        # Load the tree `name`, arguments are passed to `import_nodes`
+        """
+        rows = self.connection.execute(
+            f"SELECT level, idx, digest FROM {self.table} WHERE tree = ?", (name,)
+        )
+        return import_nodes(rows, *args, **kwargs)
+
+    def proof(self, name: str, index: int) -> List["Node"]:
+        """
+        # Make the proof of the leaf at `index` with SQL only
+
+        Same as `MerkleTree.index_proof` of the stored tree.
+        """
+        from merkly.node import Node, Side
+
+        sizes = dict(
+            self.connection.execute(
+                f"SELECT level, COUNT(*) FROM {self.table} WHERE tree = ? GROUP BY level",
+                (name,),
+            )
+        )
+        if not 0 <= index < sizes.get(0, 0):
+            raise IndexError(f"Leaf index {index} out of range")
+
+        siblings = {}
+        for level in range(len(sizes) - 1):
+            sibling = (index >> level) ^ 1
+            if sibling < sizes[level]:
+                siblings[level] = sibling
+
+        rows = self.connection.execute(
+            f"SELECT level, idx, digest FROM {self.table} WHERE tree = ? AND ("
+            + " OR ".join(["(level = ? AND idx = ?)"] * len(siblings) or ["0"])
+            + ")",
+            [name] + [value for item in siblings.items() for value in item],
+        )
+        digests = {level: digest for level, _, digest in rows}
+
+        proof = []
+        for level in sorted(siblings):
+            side = Side.LEFT if siblings[level] % 2 == 0 else Side.RIGHT
+            proof.append(Node(data=digests[level], side=side))
+        return proof
+
+    def close(self) -> None:
+        self.connection.close()
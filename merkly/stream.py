@@ -0,0 +1,117 @@
+"""
+Streaming proofs
+
+Make proofs of a few leaves in a single pass over a leaf stream, keeping only
+the frontier of subtree roots: O(log n) memory for any number of leaves.
+"""
+
+from typing import Callable, Dict, Iterable, List, Tuple, Union, TYPE_CHECKING
+
+from merkly.utils import keccak_hash
+
+if TYPE_CHECKING:
+    from merkly.node import Node
+
+
+def proof_from_iter(
+    leaves: Iterable[Union[str, bytes]],
+    index: Union[int, Iterable[int]],
+    hash_function: Callable[[bytes, bytes], bytes] = keccak_hash,
+) -> Union[List["Node"], Dict[int, List["Node"]]]:
+    """
+    # Make the proof of the leaf at `index` reading `leaves` once
+
+    ## Dev:
+        - the frontier works like a binary counter: two subtrees of the same
+        level are merged as soon as the right one is complete, then the
+        incomplete subtrees left at the end are promoted and merged from the
+        right, as `MerkleTree.mix_tree` does with odd levels
+
+    ## Args:
+        - leaves: Iterable of raw data (`str`) or of hashed leaves (`bytes`)
+        - index: Leaf index, or a few leaf indexes
+        - hash_function (Callable[[bytes, bytes], bytes], optional): Function that hashes the data.
+            * Defaults to `keccak` if not provided
+
+    ## Returns:
+        - List of Nodes, same as `MerkleTree.proof`, or a dict of them by index
+        when many indexes are given
+    """
+    from merkly.node import Node, Side
+
+    targets = {index} if isinstance(index, int) else set(index)
+    proofs: Dict[int, List[Node]] = {target: [] for target in targets}
+
+    def merge(left: Tuple, right: Tuple) -> Tuple:
+        level, left_digest, left_targets = left
+        _, right_digest, right_targets = right
+        for target in left_targets:
+            proofs[target].append(Node(data=right_digest, side=Side.RIGHT))
+        for target in right_targets:
+            proofs[target].append(Node(data=left_digest, side=Side.LEFT))
+        return (
+            level + 1,
+            hash_function(left_digest, right_digest),
+            left_targets + right_targets,
+        )
+
+    # (level, digest, targets below) of complete subtrees, higher levels first
+    frontier: List[Tuple[int, bytes, Tuple[int, ...]]] = []
+    size = 0
+    for size, leaf in enumerate(leaves, 1):
+        if isinstance(leaf, str):
+            leaf = hash_function(leaf.encode(), bytes())
+        node = (0, leaf, (size - 1,) if size - 1 in targets else ())
+        while frontier and frontier[-1][0] == node[0]:
+            node = merge(frontier.pop(), node)
+        frontier.append(node)
+
+    if size < 2:
+        raise Exception("Invalid size, need > 2")
+    for target in targets:
+        if not 0 <= target < size:
+            raise IndexError(f"Leaf index {target} out of range for size {size}")
+
+    carry = frontier.pop()
+    while frontier:
+        carry = merge(frontier.pop(), carry)
+
+    if isinstance(index, int):
+        return proofs[index]
+    return proofs
+
+
+def root_from_iter(
+    leaves: Iterable[Union[str, bytes]],
+    hash_function: Callable[[bytes, bytes], bytes] = keccak_hash,
+) -> bytes:
+    """
+    # Compute the root reading `leaves` once, with the frontier of `proof_from_iter`
+
+    ## Args:
+        - leaves: Iterable of raw data (`str`) or of hashed leaves (`bytes`)
+        - hash_function (Callable[[bytes, bytes], bytes], optional): Function that hashes the data.
+            * Defaults to `keccak` if not provided
+
+    ## Returns:
+        - The root, same as `MerkleTree.root`
+    """
+    # (level, digest) of complete subtrees, higher levels first
+    frontier: List[Tuple[int, bytes]] = []
+    size = 0
+    for size, leaf in enumerate(leaves, 1):
+        if isinstance(leaf, str):
+            leaf = hash_function(leaf.encode(), bytes())
+        level = 0
+        while frontier and frontier[-1][0] == level:
+            leaf = hash_function(frontier.pop()[1], leaf)
+            level += 1
+        frontier.append((level, leaf))
+
+    if size == 0:
+        raise ValueError("Cannot get root of an empty tree")
+
+    _, root = frontier.pop()
+    while frontier:
+        root = hash_function(frontier.pop()[1], root)
+    return root
@@ -2,8 +2,7 @@
 Utils functions
 """
 
-from typing import Callable, List, Tuple
-import keccaky
+from typing import Callable, List, Optional, Tuple, Union
 import types
 
 
@@ -43,10 +42,22 @@ def keccak(data: bytes) -> bytes:
     "541111248b45b7a8dc3f5579f630e74cb01456ea6ac067d3f4d793245a255155"
     ```
     """
+    # imported on first use, `keccaky` is not needed to import `merkly`
+    import keccaky
 
     return keccaky.hash_it_bytes(data)
 
 
+def keccak_hash(x: bytes, y: bytes) -> bytes:
+    """
+    # Default hash function of the trees, `keccak(x + y)`
+
+    A module level function, unlike a lambda it can be pickled with the tree.
+    """
+
+    return keccak(x + y)
+
+
 def half(list_item: List[int]) -> Tuple[int, int]:
     """
     # Slice a `x: List[int]` in a pairs
@@ -85,14 +96,33 @@ def slice_in_pairs(list_item: list):
     return [list_item[i : i + 2] for i in range(0, len(list_item), 2)]
 
 
-def validate_leafs(leafs: List[str]):
+def import_numpy():
+    """
+    # Import `numpy`, an optional dependency: `pip install merkly[numpy]`
+    """
+    try:
+        import numpy
+    except ImportError as err:
+        raise ImportError(
+            "Install numpy to use arrays: pip install merkly[numpy]"
+        ) from err
+
+    return numpy
+
+
+def validate_leafs(leafs: Union[List[str], List[bytes]]):
+    """
+    # Leafs must be all raw data (`str`) or all already hashed (`bytes`)
+    """
     size = len(leafs)
 
     if size < 2:
         raise Exception("Invalid size, need > 2")
 
     a = isinstance(leafs, List)
-    b = all(isinstance(leaf, str) for leaf in leafs)
+    b = all(isinstance(leaf, str) for leaf in leafs) or all(
+        isinstance(leaf, bytes) for leaf in leafs
+    )
     if not (a and b):
         raise Exception("Invalid type of leafs")
 
@@ -110,6 +140,20 @@ def validate_hash_function(hash_function: Callable[[bytes, bytes], bytes]):
         raise InvalidHashFunctionError()
 
 
+def function_key(function: Callable) -> Optional[Tuple[str, str]]:
+    """
+    # Stable cache key of a module level function, `None` for lambdas and closures
+
+    A new lambda per call would add a cache entry per tree, they are not cached.
+    """
+    if not isinstance(function, types.FunctionType):
+        return None
+    name = function.__qualname__
+    if "<" in name:
+        return None
+    return (function.__module__, name)
+
+
 def is_power_2(number: int) -> bool:
     """
     # Verify if `x: int` is power of 2
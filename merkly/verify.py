@@ -0,0 +1,172 @@
+"""
+Merkle Proof verification
+
+This module only depends on the standard library: `keccaky` is imported
+the first time the default hash function runs and `pydantic` is never
+imported, so it can be used where import time matters (e.g. cold starts).
+"""
+
+from typing import Callable, List, Union, TYPE_CHECKING
+
+from merkly.utils import keccak_hash
+
+if TYPE_CHECKING:
+    from merkly.node import Node
+
+# `Side.RIGHT.value`, sides are read through `.value` to not import `merkly.node`
+RIGHT = 1
+
+
+def parse_root(root: Union[bytes, str]) -> bytes:
+    """
+    # Parse a root given as `bytes` or hexadecimal `str` (with or without `0x`)
+
+    Parse it once and pass the `bytes` when verifying many proofs against it.
+
+    ```python
+    >>> parse_root("0x68203f90")
+    b'h ?\\x90'
+    ```
+    """
+    if isinstance(root, (bytes, bytearray)):
+        return bytes(root)
+    if root[:2] in ("0x", "0X"):
+        root = root[2:]
+    return bytes.fromhex(root)
+
+
+def compute_root(
+    proof: List["Node"], leaf: bytes, hash_function: Callable[[bytes, bytes], bytes]
+) -> bytes:
+    """
+    # Fold a proof over a hashed `leaf` keeping only the running digest
+    """
+    digest = leaf
+    for node in proof:
+        if node.side.value == RIGHT:
+            digest = hash_function(digest, node.data)
+        else:
+            digest = hash_function(node.data, digest)
+    return digest
+
+
+def verify_proof(
+    proof: List["Node"],
+    leaf: Union[str, bytes],
+    root: Union[str, bytes],
+    hash_function: Callable[[bytes, bytes], bytes] = None,
+) -> bool:
+    """
+    # Verify a proof of `leaf` against `root`
+
+    ## Args:
+        - proof: List of Nodes, as returned by `MerkleTree.proof`
+        - leaf: Raw data of the leaf (`str`) or the already hashed leaf (`bytes`)
+        - root: Expected root as `bytes` or hexadecimal `str`
+        - hash_function (Callable[[bytes, bytes], bytes], optional): Function that hashes the data.
+            * Defaults to `keccak` if not provided
+
+    ## Returns:
+        - `True` if the proof rebuilds `root`, `False` otherwise
+          (also when `root` is not valid hexadecimal)
+    """
+    if hash_function is None:
+        hash_function = keccak_hash
+
+    try:
+        expected = parse_root(root)
+    except ValueError:
+        return False
+
+    if isinstance(leaf, str):
+        leaf = hash_function(leaf.encode(), bytes())
+
+    return compute_root(proof, leaf, hash_function) == expected
+
+
+def compute_sorted_root(
+    proof: List[bytes], leaf: bytes, hash_function: Callable[[bytes, bytes], bytes]
+) -> bytes:
+    """
+    # Fold a sorted-pair proof over a hashed `leaf`
+
+    Each pair is sorted before hashing, as OpenZeppelin's `MerkleProof` does,
+    so the proof is just the sibling digests.
+    """
+    digest = leaf
+    for sibling in proof:
+        if sibling < digest:
+            digest = hash_function(sibling, digest)
+        else:
+            digest = hash_function(digest, sibling)
+    return digest
+
+
+def verify_sorted_proof(
+    proof: List[bytes],
+    leaf: Union[str, bytes],
+    root: Union[str, bytes],
+    hash_function: Callable[[bytes, bytes], bytes] = None,
+) -> bool:
+    """
+    # Verify a proof of a `MerkleTree(..., sort_pairs=True)`
+
+    Same arguments as `verify_proof` but `proof` is a list of digests.
+    """
+    if hash_function is None:
+        hash_function = keccak_hash
+
+    try:
+        expected = parse_root(root)
+    except ValueError:
+        return False
+
+    if isinstance(leaf, str):
+        leaf = hash_function(leaf.encode(), bytes())
+
+    return compute_sorted_root(proof, leaf, hash_function) == expected
+
+
+def encode_proof(proof: List[bytes]) -> bytes:
+    """
+    # Serialize a sorted-pair proof as its concatenated digests
+    """
+    return b"".join(proof)
+
+
+def decode_proof(data: bytes, digest_size: int = 32) -> List[bytes]:
+    """
+    # Split the output of `encode_proof` back into digests of `digest_size` bytes
+    """
+    if len(data) % digest_size != 0:
+        raise ValueError(
+            f"Proof length {len(data)} is not a multiple of digest size {digest_size}"
+        )
+    return [data[i : i + digest_size] for i in range(0, len(data), digest_size)]
+
+
+def verify_cap_proof(
+    proof: Union[List["Node"], List[bytes]],
+    leaf: Union[str, bytes],
+    cap: List[Union[str, bytes]],
+    cap_index: int,
+    hash_function: Callable[[bytes, bytes], bytes] = None,
+    sort_pairs: bool = False,
+) -> bool:
+    """
+    # Verify a proof of a `MerkleTree(..., cap_height=c)` against its Merkle cap
+
+    ## Args:
+        - proof: Proof up to the cap level, as returned by `MerkleTree.proof`
+        - leaf: Raw data of the leaf (`str`) or the already hashed leaf (`bytes`)
+        - cap: Published cap, as `bytes` or hexadecimal `str`
+        - cap_index: Index of the cap node above the leaf, `MerkleTree.cap_index(leaf_index)`
+        - hash_function (Callable[[bytes, bytes], bytes], optional): Function that hashes the data.
+            * Defaults to `keccak` if not provided
+        - sort_pairs: The tree was made with `sort_pairs`
+    """
+    if not 0 <= cap_index < len(cap):
+        return False
+    if sort_pairs:
+        return verify_sorted_proof(proof, leaf, cap[cap_index], hash_function)
+    return verify_proof(proof, leaf, cap[cap_index], hash_function)
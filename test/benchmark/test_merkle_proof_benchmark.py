@@ -37,3 +37,16 @@ def test_create_proof_100_leaves(benchmark):
 @pytest.mark.benchmark(group="MerkleTreeProof", timer=time.time)
 def test_create_proof_1000_leaves(benchmark):
     benchmark(create_proof_1000_leaves)
+
+
+def create_all_proofs_1000_leaves(tree: MerkleTree):
+    for _, proof in tree.iter_proofs():
+        assert proof
+
+
+@pytest.mark.benchmark(group="MerkleTreeAllProofs", timer=time.time)
+def test_create_all_proofs_1000_leaves(benchmark):
+    tree = MerkleTree([str(i) for i in range(1000)])
+    tree.levels  # built once, out of the rounds
+
+    benchmark(create_all_proofs_1000_leaves, tree)
@@ -37,3 +37,21 @@ def test_verify_proof_100_leaves(benchmark):
 @pytest.mark.benchmark(group="MerkleTreeVerify", timer=time.time)
 def test_verify_proof_1000_leaves(benchmark):
     benchmark(verify_proof_1000_leaves)
+
+
+@pytest.mark.benchmark(group="MerkleTreeVerifyOnly", timer=time.time)
+def test_verify_only_proof_1000_leaves(benchmark):
+    tree = MerkleTree([str(i) for i in range(1000)])
+    proof = tree.proof("0")
+    tree.root  # the root is cached by the first call, keep it out of the rounds
+
+    assert benchmark(tree.verify, proof, "0")
+
+
+@pytest.mark.benchmark(group="MerkleTreeVerifyOnly", timer=time.time)
+def test_verify_proof_only_1000_leaves(benchmark):
+    tree = MerkleTree([str(i) for i in range(1000)])
+    proof = tree.proof("0")
+    root = tree.root
+
+    assert benchmark(MerkleTree.verify_proof, proof, tree.leaves[0], root)
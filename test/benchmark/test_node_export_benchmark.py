@@ -0,0 +1,47 @@
+from merkly.export import export_nodes, import_nodes
+from merkly.mtree import MerkleTree
+from merkly.sqlite import SQLiteNodeStore
+import hashlib
+import pytest
+import time
+
+
+def sha256(x: bytes, y: bytes) -> bytes:
+    return hashlib.sha256(x + y).digest()
+
+
+@pytest.fixture(scope="module")
+def tree() -> MerkleTree:
+    return MerkleTree([str(i) for i in range(100000)], sha256)
+
+
+def export_100000_leaves(tree: MerkleTree):
+    for _ in export_nodes(tree, batch_size=10000):
+        pass
+
+
+def import_100000_leaves(tree: MerkleTree, rows: list):
+    assert import_nodes(rows, sha256).root == tree.root
+
+
+def sqlite_round_trip_100000_leaves(tree: MerkleTree):
+    store = SQLiteNodeStore(":memory:")
+    store.save("tree", tree)
+    assert store.load("tree", sha256).root == tree.root
+    store.close()
+
+
+@pytest.mark.benchmark(group="MerkleTreeNodeExport", timer=time.time)
+def test_export_100000_leaves(benchmark, tree):
+    benchmark(export_100000_leaves, tree)
+
+
+@pytest.mark.benchmark(group="MerkleTreeNodeExport", timer=time.time)
+def test_import_100000_leaves(benchmark, tree):
+    rows = [row for batch in export_nodes(tree) for row in batch]
+    benchmark(import_100000_leaves, tree, rows)
+
+
+@pytest.mark.benchmark(group="MerkleTreeNodeExport", timer=time.time)
+def test_sqlite_round_trip_100000_leaves(benchmark, tree):
+    benchmark(sqlite_round_trip_100000_leaves, tree)
@@ -0,0 +1,38 @@
+from merkly.blob import hash_blob, hash_blobs
+from merkly.mtree import MerkleTree
+from pathlib import Path
+import hashlib
+import io
+
+
+def test_hash_blob_matches_leaf_hash(tmp_path: Path):
+    path = tmp_path / "blob"
+    path.write_bytes(b"merkle" * 1000)
+    tree = MerkleTree(["merkle" * 1000, "b"])
+
+    assert hash_blob(path, chunk_size=7) == tree.leaves[0]
+    assert hash_blob(str(path)) == tree.leaves[0]
+    assert hash_blob(io.BytesIO(b"b")) == tree.leaves[1]
+
+
+def test_hash_blobs_feed_merkle_tree(tmp_path: Path):
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"blob{i}"
+        path.write_bytes(str(i).encode() * 4096)
+        paths.append(path)
+
+    leaves = hash_blobs(paths, chunk_size=1000, workers=3)
+    tree = MerkleTree(leaves)
+
+    assert tree.root == MerkleTree([str(i) * 4096 for i in range(5)]).root
+    assert tree.verify(tree.proof(leaves[3]), leaves[3])
+
+
+def test_hash_blob_with_hashlib():
+    data = b"x" * 10000
+
+    assert (
+        hash_blob(io.BytesIO(data), hashlib.sha256, 512)
+        == hashlib.sha256(data).digest()
+    )
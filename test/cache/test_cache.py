@@ -0,0 +1,111 @@
+from hashlib import sha256
+from merkly.cache import LeafHashCache
+from merkly.mtree import MerkleTree
+from pathlib import Path
+import sqlite3
+
+
+def counting_hash():
+    calls = []
+
+    def hash_function(x: bytes, y: bytes) -> bytes:
+        calls.append(x)
+        return x + y
+
+    return hash_function, calls
+
+
+def test_memory_cache_only_hashes_new_leaves():
+    hash_function, calls = counting_hash()
+    cache = LeafHashCache("concat")
+
+    first = MerkleTree(["a", "b", "c", "d"], hash_function, cache=cache)
+    calls.clear()
+    second = MerkleTree(["a", "b", "c", "x"], hash_function, cache=cache)
+
+    assert first.leaves[:3] == second.leaves[:3]
+    assert second.leaves == [b"a", b"b", b"c", b"x"]
+    # the leaf hash calls have an empty right side
+    assert [x for x in calls if len(x) == 1] == [b"x"]
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 5
+
+
+def test_memory_cache_capacity():
+    cache = LeafHashCache("concat", capacity=2)
+    cache.hash_leaves([b"a", b"b", b"c"], lambda x: x)
+
+    assert len(cache) == 2
+    cache.hash_leaves([b"a"], lambda x: x)
+    assert cache.hit_rate == 0
+
+
+def test_disk_cache_survives_process(tmp_path: Path):
+    path = str(tmp_path / "leaves.sqlite")
+    leaves = [str(i) for i in range(20)]
+
+    cache = LeafHashCache("keccak", path=path)
+    tree = MerkleTree(leaves, cache=cache)
+    cache.close()
+
+    cache = LeafHashCache("keccak", path=path)
+    again = MerkleTree(leaves, cache=cache)
+    assert again.root == tree.root
+    assert cache.disk_hits == 20
+    assert cache.hit_rate == 1
+
+    # another namespace does not see those leaves
+    other = LeafHashCache("sha256", path=path)
+    other.hash_leaves([b"0"], lambda x: x)
+    assert other.misses == 1
+
+
+def test_disk_cache_eviction(tmp_path: Path):
+    cache = LeafHashCache(
+        "concat",
+        capacity=1,
+        path=str(tmp_path / "leaves.sqlite"),
+        max_disk_bytes=64 * 1024,
+    )
+    for start in range(0, 20000, 1000):
+        cache.hash_leaves(
+            [str(i).encode() * 8 for i in range(start, start + 1000)], lambda x: x
+        )
+
+    cache.hash_leaves([b"0" * 8], lambda x: x)
+    assert cache.disk_hits == 0
+    cache.close()
+
+
+def sha256_hash(x: bytes, y: bytes) -> bytes:
+    return sha256(x + y).digest()
+
+
+def test_cache_keeps_hash_functions_apart(tmp_path: Path):
+    path = str(tmp_path / "leaves.sqlite")
+    leaves = [str(i) for i in range(8)]
+
+    cache = LeafHashCache("keccak", path=path)
+    MerkleTree(leaves, sha256_hash, cache=cache)
+    assert MerkleTree(leaves, cache=cache).root == MerkleTree(leaves).root
+    cache.close()
+
+    cache = LeafHashCache("keccak", path=path)
+    assert MerkleTree(leaves, cache=cache).root == MerkleTree(leaves).root
+    assert cache.disk_hits == 8
+
+
+def test_memory_hits_refresh_disk_use(tmp_path: Path):
+    path = str(tmp_path / "leaves.sqlite")
+    cache = LeafHashCache("concat", path=path)
+    cache.hash_leaves([b"hot"], lambda x: x)
+    cache.hash_leaves([b"cold"], lambda x: x)
+    cache.hash_leaves([b"hot"], lambda x: x)
+    assert cache.hits == 1
+    cache.close()
+
+    db = sqlite3.connect(path)
+    used = [row[0] for row in db.execute("SELECT used FROM leaf_hash ORDER BY used")]
+    db.close()
+    # "hot" was used last, it would be evicted after "cold"
+    assert used == [2, 3]
@@ -0,0 +1,54 @@
+from merkly.mtree import MerkleTree
+from merkly.padded import PaddedMerkleTree
+from merkly.verify import verify_cap_proof
+from pytest import mark, raises
+
+LEAVES = [str(i) for i in range(13)]
+
+
+@mark.parametrize("cap_height", [0, 1, 2, 3, 4, 10])
+def test_cap_proofs(cap_height: int):
+    tree = MerkleTree(LEAVES, cap_height=cap_height)
+    full = MerkleTree(LEAVES)
+
+    assert len(tree.cap) <= 2**cap_height
+    for i, leaf in enumerate(LEAVES):
+        proof = tree.proof(leaf)
+        # the cap proof is the bottom of the full proof
+        assert proof == full.proof(leaf)[: len(proof)]
+        assert tree.verify(proof, leaf)
+        assert verify_cap_proof(proof, leaf, tree.cap, tree.cap_index(i))
+        assert not verify_cap_proof(proof, "z", tree.cap, tree.cap_index(i))
+
+
+def test_cap_cuts_proof_length():
+    leaves = [str(i) for i in range(16)]
+    tree = MerkleTree(leaves, cap_height=2)
+
+    assert tree.cap_level == 2
+    assert tree.cap == MerkleTree(leaves).levels[2]
+    assert len(tree.proof("5")) == 2
+    assert tree.cap_index(5) == 1
+
+
+def test_cap_zero_is_root():
+    tree = MerkleTree(LEAVES, cap_height=0)
+
+    assert tree.cap == [tree.root]
+
+
+def test_cap_with_sorted_pairs_and_padding():
+    tree = PaddedMerkleTree(LEAVES, depth=6, cap_height=2, sort_pairs=True)
+    proof = tree.proof("7")
+
+    assert len(proof) == 4
+    assert verify_cap_proof(proof, "7", tree.cap, tree.cap_index(7), sort_pairs=True)
+
+
+def test_cap_errors():
+    with raises(ValueError):
+        MerkleTree(LEAVES, cap_height=-1)
+
+    tree = MerkleTree(LEAVES, cap_height=2)
+    assert not tree.verify(tree.proof("1"), "z")
+    assert not verify_cap_proof(tree.proof("1"), "1", tree.cap, len(tree.cap))
@@ -0,0 +1,66 @@
+from merkly.cache import LeafHashCache
+from merkly.mtree import MerkleTree
+from pytest import importorskip, raises
+
+LEAVES = [str(i) for i in range(9)]
+
+
+def test_from_buffer_hashed_bytes():
+    tree = MerkleTree(LEAVES)
+    copy = MerkleTree.from_buffer(b"".join(tree.leaves), width=32)
+
+    assert copy.leaves == tree.leaves
+    assert copy.root == tree.root
+
+
+def test_from_buffer_raw_records():
+    tree = MerkleTree(["aa", "bb", "cc"], lambda x, y: x + y)
+    copy = MerkleTree.from_buffer(
+        bytearray(b"aabbcc"), lambda x, y: x + y, width=2, hashed=False
+    )
+
+    assert copy.root == tree.root
+
+
+def test_from_buffer_raw_records_use_cache():
+    cache = LeafHashCache("concat")
+    tree = MerkleTree.from_buffer(
+        b"aabbcc", lambda x, y: x + y, width=2, hashed=False, cache=cache
+    )
+
+    assert tree.leaves == [b"aa", b"bb", b"cc"]
+    assert cache.misses == 3
+
+
+def test_from_buffer_errors():
+    with raises(Exception):
+        MerkleTree.from_buffer(b"aa", width=2)
+    with raises(ValueError):
+        MerkleTree.from_buffer(b"aabbc", width=2)
+    with raises(ValueError):
+        MerkleTree.from_buffer(b"aabbcc")
+
+
+def test_numpy_round_trip():
+    np = importorskip("numpy")
+    tree = MerkleTree(LEAVES)
+    leaves = tree.level_array(0)
+
+    assert leaves.shape == (9, 32)
+    assert leaves.dtype == np.uint8
+    assert MerkleTree.from_buffer(leaves).root == tree.root
+    assert MerkleTree.from_buffer(leaves.view("S32").ravel()).root == tree.root
+    assert tree.root_array().tobytes() == tree.root
+    assert tree.level_array(-1).tobytes() == tree.root
+
+
+def test_numpy_raw_records():
+    np = importorskip("numpy")
+    records = np.array([b"a", b"b", b"c"], dtype="S1")
+
+    tree = MerkleTree.from_buffer(records, hashed=False)
+    assert tree.root == MerkleTree(["a", "b", "c"]).root
+
+    # shorter `S<n>` records keep their NUL padding
+    padded = MerkleTree.from_buffer(np.array([b"a", b"bb", b"c"]), hashed=False)
+    assert padded.root == MerkleTree(["a\x00", "bb", "c\x00"]).root
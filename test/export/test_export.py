@@ -0,0 +1,105 @@
+from merkly.export import export_nodes, import_nodes
+from merkly.mtree import MerkleTree
+from merkly.padded import PaddedMerkleTree
+from merkly.sqlite import SQLiteNodeStore
+from pathlib import Path
+from pytest import mark, raises
+
+
+def concat(x: bytes, y: bytes) -> bytes:
+    return x + y
+
+
+LEAVES = [str(i) for i in range(11)]
+
+
+@mark.parametrize("order", ["level", "subtree"])
+def test_export_import_round_trip(order: str):
+    tree = MerkleTree(LEAVES, concat)
+    batches = list(export_nodes(tree, order, batch_size=4))
+    rows = [row for batch in batches for row in batch]
+
+    assert all(len(batch) <= 4 for batch in batches)
+    assert len(rows) == sum(len(level) for level in tree.levels)
+
+    loaded = import_nodes(rows, concat)
+    assert loaded.levels == tree.levels
+    assert loaded.root == tree.root
+    assert loaded.proof("7") == tree.proof("7")
+
+
+def test_loaded_tree_proofs_hash_nothing():
+    calls = []
+
+    def counting(x: bytes, y: bytes) -> bytes:
+        calls.append(y)
+        return x + y
+
+    tree = MerkleTree(LEAVES, concat)
+    rows = [row for batch in export_nodes(tree) for row in batch]
+    loaded = import_nodes(rows, counting)
+    calls.clear()
+
+    for i, leaf in enumerate(LEAVES):
+        assert loaded.proof(leaf) == tree.proof(leaf)
+    # only the raw leaves are hashed, no pair of nodes
+    assert all(right == b"" for right in calls)
+
+
+def test_import_padded_tree():
+    tree = PaddedMerkleTree(["a", "b", "c"], concat, depth=4)
+    rows = [row for batch in export_nodes(tree) for row in batch]
+
+    with raises(ValueError):
+        import_nodes(rows, concat)
+    with raises(ValueError):
+        import_nodes(rows, concat, tree_class=PaddedMerkleTree, depth=3)
+
+    loaded = import_nodes(rows, concat, tree_class=PaddedMerkleTree, depth=4)
+    assert loaded.root == tree.root
+    assert loaded.verify(loaded.proof("a"), "a")
+
+
+def test_subtree_order_is_clustered():
+    tree = MerkleTree(["a", "b", "c", "d"], concat)
+    rows = [row for batch in export_nodes(tree, "subtree") for row in batch]
+
+    assert [(level, index) for level, index, _ in rows] == [
+        (2, 0),
+        (1, 0),
+        (0, 0),
+        (0, 1),
+        (1, 1),
+        (0, 2),
+        (0, 3),
+    ]
+
+
+def test_import_errors():
+    tree = MerkleTree(LEAVES, concat)
+    rows = [row for batch in export_nodes(tree) for row in batch]
+
+    with raises(ValueError):
+        import_nodes(rows[1:], concat)
+    with raises(ValueError):
+        import_nodes(rows[:-1], concat)
+    with raises(ValueError):
+        import_nodes([row for row in rows if row[:2] != (0, len(LEAVES) - 1)], concat)
+    with raises(ValueError):
+        list(export_nodes(tree, "random"))
+
+
+def test_sqlite_store(tmp_path: Path):
+    tree = MerkleTree(LEAVES)
+    store = SQLiteNodeStore(str(tmp_path / "nodes.sqlite"))
+    store.save("airdrop", tree, order="subtree", batch_size=5)
+
+    loaded = store.load("airdrop")
+    assert loaded.root == tree.root
+    for i, leaf in enumerate(LEAVES):
+        assert store.proof("airdrop", i) == tree.proof(leaf)
+        assert tree.verify(store.proof("airdrop", i), leaf)
+
+    with raises(IndexError):
+        store.proof("airdrop", len(LEAVES))
+    store.close()
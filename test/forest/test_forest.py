@@ -0,0 +1,70 @@
+from merkly.forest import MerkleForest, shard_ranges, shard_root
+from merkly.mtree import MerkleTree
+from merkly.utils import PowerOfTwoError
+from pytest import mark, raises
+
+
+def build_forest(leaves, shard_size):
+    forest = MerkleForest(len(leaves), shard_size)
+    for i, (start, end) in enumerate(forest.ranges):
+        forest.set_shard(i, shard_root(leaves[start:end]))
+    return forest
+
+
+@mark.parametrize(
+    "size, shard_size", [(2, 2), (9, 2), (10, 4), (16, 4), (17, 8), (33, 16)]
+)
+def test_forest_matches_merkle_tree(size: int, shard_size: int):
+    leaves = [str(i) for i in range(size)]
+    forest = build_forest(leaves, shard_size)
+    tree = MerkleTree(leaves)
+
+    assert forest.root == tree.root
+
+    for i, leaf in enumerate(leaves):
+        shard = forest.shard_of(i)
+        start, end = forest.ranges[shard]
+        if end - start > 1:
+            shard_proof = MerkleTree(leaves[start:end]).proof(leaf)
+        else:
+            shard_proof = []
+
+        proof = forest.proof(shard, shard_proof)
+        assert proof == tree.proof(leaf)
+        assert forest.verify(proof, leaf)
+
+
+def test_forest_rebuilds_only_changed_shard():
+    leaves = [str(i) for i in range(12)]
+    forest = build_forest(leaves, 4)
+    forest.root
+
+    leaves[5] = "x"
+    forest.set_shard(1, MerkleTree(leaves[4:8]))
+
+    assert forest.root == MerkleTree(leaves).root
+
+
+def test_forest_errors():
+    with raises(PowerOfTwoError):
+        shard_ranges(10, 3)
+
+    forest = MerkleForest(10, 4)
+    forest.set_shard(0, shard_root(["0", "1", "2", "3"]))
+    assert forest.missing == [1, 2]
+    with raises(ValueError):
+        forest.root
+    with raises(ValueError):
+        forest.set_shard(2, MerkleTree(["8", "9", "10"]))
+    with raises(ValueError):
+        forest.set_shard(1, MerkleTree(["4", "5", "6", "7"], lambda x, y: x + y))
+    with raises(ValueError):
+        forest.set_shard(1, MerkleTree(["4", "5", "6", "7"], sort_pairs=True))
+
+
+def test_forest_hashed_leaves():
+    leaves = MerkleTree([str(i) for i in range(9)]).leaves
+    forest = build_forest(leaves, 4)
+
+    assert shard_root(leaves[8:]) == leaves[8]
+    assert forest.root == MerkleTree(leaves).root
@@ -0,0 +1,44 @@
+from merkly.mtree import MerkleTree
+from merkly.padded import PaddedMerkleTree
+from pytest import mark
+
+
+def concat(x: bytes, y: bytes) -> bytes:
+    return x + y
+
+
+@mark.parametrize("size", [2, 3, 7, 8, 13, 32])
+def test_iter_proofs_matches_proof(size: int):
+    leaves = [str(i) for i in range(size)]
+    tree = MerkleTree(leaves, concat)
+
+    proofs = list(tree.iter_proofs())
+    assert [index for index, _ in proofs] == list(range(size))
+    for index, proof in proofs:
+        assert proof == tree.proof(leaves[index])
+        assert [node.side for node in proof] == [
+            node.side for node in tree.proof(leaves[index])
+        ]
+
+
+def test_iter_proofs_range():
+    tree = MerkleTree([str(i) for i in range(20)], concat)
+
+    proofs = list(tree.iter_proofs(5, 9))
+    assert [index for index, _ in proofs] == [5, 6, 7, 8]
+    assert all(proof == tree.index_proof(index) for index, proof in proofs)
+    assert list(tree.iter_proofs(18, 100))[-1][0] == 19
+
+
+@mark.parametrize(
+    "tree",
+    [
+        MerkleTree([str(i) for i in range(11)], concat, sort_pairs=True),
+        MerkleTree([str(i) for i in range(11)], concat, cap_height=2),
+        PaddedMerkleTree([str(i) for i in range(11)], concat, depth=6, zero_leaf=b"0"),
+    ],
+)
+def test_iter_proofs_modes(tree: MerkleTree):
+    for index, proof in tree.iter_proofs():
+        assert proof == tree.index_proof(index)
+        assert tree.verify(proof, tree.leaves[index])
@@ -0,0 +1,67 @@
+from merkly.mtree import MerkleTree
+from merkly.utils import keccak_hash
+from merkly.padded import PaddedMerkleTree, zero_hashes
+from pytest import mark, raises
+
+
+def concat(x: bytes, y: bytes) -> bytes:
+    return x + y
+
+
+def test_zero_hashes():
+    assert zero_hashes(3, b"0", concat) == [b"0", b"00", b"0000", b"00000000"]
+
+
+def test_padded_root():
+    tree = PaddedMerkleTree(["a", "b", "c"], concat, depth=3, zero_leaf=b"0")
+
+    assert tree.root == b"abc0" + b"0000"
+    assert tree.levels == [[b"a", b"b", b"c"], [b"ab", b"c0"], [b"abc0"], [b"abc00000"]]
+
+
+def test_padded_equals_full_tree_when_complete():
+    leaves = [str(i) for i in range(8)]
+
+    assert PaddedMerkleTree(leaves).root == MerkleTree(leaves).root
+
+
+@mark.parametrize("leaf", ["a", "b", "c", "d", "e"])
+def test_padded_proof_has_depth_siblings(leaf: str):
+    tree = PaddedMerkleTree(["a", "b", "c", "d", "e"], depth=5)
+    proof = tree.proof(leaf)
+
+    assert len(proof) == 5
+    assert tree.verify(proof, leaf)
+    assert MerkleTree.verify_proof(proof, leaf, tree.root)
+
+
+def test_padded_sorted_pairs():
+    tree = PaddedMerkleTree(["a", "b", "c"], depth=4, sort_pairs=True)
+    proof = tree.index_proof(2)
+
+    assert len(proof) == 4
+    assert tree.verify(proof, "c")
+
+
+def test_padded_errors():
+    with raises(ValueError):
+        PaddedMerkleTree(["a", "b", "c"], depth=1)
+
+    tree = PaddedMerkleTree(["a", "b", "c"], depth=2)
+    with raises(ValueError):
+        tree.proof("z")
+    with raises(IndexError):
+        tree.index_proof(3)
+
+
+def test_zero_hashes_cache_is_bounded():
+    from merkly.padded import ZERO_HASHES
+
+    size = len(ZERO_HASHES)
+    for _ in range(5):
+        PaddedMerkleTree(["a", "b", "c"], lambda x, y: x + y, depth=3)
+    assert len(ZERO_HASHES) == size
+
+    PaddedMerkleTree(["a", "b", "c"], keccak_hash, depth=3)
+    PaddedMerkleTree(["a", "b", "c"], keccak_hash, depth=4)
+    assert len(ZERO_HASHES) <= size + 1
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+from merkly.mtree import MerkleTree
+from merkly.persistent import PersistentMerkleTree
+from pytest import mark, raises
+
+
+@mark.parametrize("size", [2, 3, 5, 8, 13])
+def test_persistent_matches_merkle_tree(size: int):
+    leaves = [str(i) for i in range(size)]
+    ptree = PersistentMerkleTree(leaves)
+    tree = MerkleTree(leaves)
+
+    assert ptree.root == tree.root
+    for i, leaf in enumerate(leaves):
+        assert ptree.snapshot().proof(i) == tree.proof(leaf)
+        assert ptree.snapshot().leaf(i) == tree.leaves[i]
+
+
+def test_commit_creates_version_and_keeps_old_one():
+    leaves = [str(i) for i in range(7)]
+    ptree = PersistentMerkleTree(leaves)
+    first = ptree.snapshot()
+
+    second = ptree.commit({2: "x", 6: "y"})
+    leaves[2], leaves[6] = "x", "y"
+
+    assert second.version == 1
+    assert ptree.versions == [0, 1]
+    assert second.root == MerkleTree(leaves).root
+    assert first.root == MerkleTree([str(i) for i in range(7)]).root
+    assert second.verify(second.proof(2), "x")
+    assert not first.verify(first.proof(2), "x")
+
+
+def test_commit_shares_unchanged_subtrees():
+    ptree = PersistentMerkleTree([str(i) for i in range(8)])
+    first = ptree.snapshot()
+    second = ptree.commit({0: "x"})
+
+    # only the left half changed
+    assert first._top[2] is second._top[2]
+    assert first._top[1] is not second._top[1]
+
+
+def test_retain_drops_old_versions():
+    ptree = PersistentMerkleTree(["a", "b", "c"], retain=2)
+    kept = ptree.snapshot()
+    for leaf in ["d", "e", "f"]:
+        ptree.commit({0: leaf})
+
+    assert ptree.versions == [2, 3]
+    assert kept.verify(kept.proof(0), "a")
+    with raises(KeyError):
+        ptree.snapshot(0)
+
+
+def test_invalid_index():
+    ptree = PersistentMerkleTree(["a", "b", "c"])
+
+    with raises(IndexError):
+        ptree.commit({3: "d"})
+    with raises(IndexError):
+        ptree.snapshot().proof(-1)
+
+
+def test_snapshot_reads_while_committing():
+    ptree = PersistentMerkleTree([str(i) for i in range(16)], lambda x, y: x + y)
+
+    def read(_):
+        snapshot = ptree.snapshot()
+        return all(
+            snapshot.verify(snapshot.proof(i), snapshot.leaf(i)) for i in range(16)
+        )
+
+    with ThreadPoolExecutor(4) as pool:
+        reads = pool.map(read, range(200))
+        for i in range(50):
+            ptree.commit({i % 16: f"v{i}"})
+
+        assert all(reads)
@@ -0,0 +1,184 @@
+from hashlib import sha256
+import logging
+
+from merkly.mtree import MerkleTree
+from merkly.padded import PaddedMerkleTree
+from merkly import planner
+from merkly.planner import (
+    CALIBRATIONS,
+    Calibration,
+    Plan,
+    Strategy,
+    available_memory,
+    calibrate,
+    calibration_key,
+    plan,
+)
+from merkly.stream import root_from_iter
+from pytest import mark, raises
+
+
+def sha256_hash(x: bytes, y: bytes) -> bytes:
+    return sha256(x + y).digest()
+
+
+@mark.parametrize(
+    "chosen",
+    [
+        Plan(Strategy.SERIAL, 1, 4, "test"),
+        Plan(Strategy.THREADED, 2, 4, "test"),
+        Plan(Strategy.PROCESS, 2, 4, "test"),
+        Plan(Strategy.STREAMING, 1, 4, "test"),
+    ],
+)
+@mark.parametrize("sort_pairs", [False, True])
+def test_strategies_match_serial(chosen: Plan, sort_pairs: bool):
+    leaves = [str(i) for i in range(37)]
+    serial = MerkleTree(leaves, sha256_hash, sort_pairs=sort_pairs)
+    tree = MerkleTree(leaves, sha256_hash, sort_pairs=sort_pairs, strategy=chosen)
+
+    assert tree.plan == chosen
+    assert tree.leaves == serial.leaves
+    assert tree.root == serial.root
+    assert tree.levels == serial.levels
+    assert tree.proof("20") == serial.proof("20")
+
+
+def test_forced_strategy():
+    tree = MerkleTree([str(i) for i in range(10)], strategy=Strategy.THREADED)
+
+    assert tree.plan.strategy == Strategy.THREADED
+    assert tree.plan.reason == "forced"
+    assert tree.root == MerkleTree([str(i) for i in range(10)]).root
+
+
+def test_padded_tree_with_threads():
+    leaves = [str(i) for i in range(21)]
+    chosen = Plan(Strategy.THREADED, 2, 2, "test")
+
+    tree = PaddedMerkleTree(leaves, sha256_hash, depth=6, strategy=chosen)
+    assert tree.root == PaddedMerkleTree(leaves, sha256_hash, depth=6).root
+
+
+def test_small_tree_is_serial_without_calibration():
+    def hash_function(x: bytes, y: bytes) -> bytes:
+        return x + y
+
+    tree = MerkleTree([str(i) for i in range(10)], hash_function)
+
+    assert tree.plan.strategy == Strategy.SERIAL
+    assert calibration_key(hash_function) not in CALIBRATIONS
+
+
+def test_plan_from_calibration():
+    slow = Calibration(hash_seconds=1e-3, thread_speedup=1.0, cores=8)
+    threads = Calibration(hash_seconds=1e-5, thread_speedup=3.0, cores=4)
+    memory = 2**40
+
+    assert plan(10**6, calibration=slow, memory=memory).strategy == Strategy.SERIAL
+    assert plan(10**6, calibration=threads, memory=memory).strategy == Strategy.THREADED
+    assert plan(10**6, calibration=slow, memory=10**6).strategy == Strategy.STREAMING
+
+
+def test_plan_processes_once_enabled(monkeypatch):
+    measured = Calibration(
+        hash_seconds=1e-5,
+        thread_speedup=1.0,
+        cores=8,
+        spawn_seconds=0.2,
+        process_speedup=6.0,
+    )
+    memory = 2**40
+
+    # processes are not chosen on their own until enabled
+    chosen = plan(10**6, sha256_hash, calibration=measured, memory=memory)
+    assert chosen.strategy == Strategy.SERIAL
+
+    monkeypatch.setattr(planner, "PROCESSES", True)
+    chosen = plan(10**6, sha256_hash, calibration=measured, memory=memory)
+    assert chosen.strategy == Strategy.PROCESS
+    assert chosen.workers == 8
+    # the start-up does not pay off for a smaller tree
+    chosen = plan(5000, sha256_hash, calibration=measured, memory=memory)
+    assert chosen.strategy == Strategy.SERIAL
+    # nor for a hash function that cannot be pickled
+    chosen = plan(10**6, lambda x, y: x + y, calibration=measured, memory=memory)
+    assert chosen.strategy == Strategy.SERIAL
+
+
+def test_calibrate_chunks_through_the_pools(monkeypatch):
+    monkeypatch.setattr(planner, "CALIBRATIONS", {})
+    monkeypatch.setattr(planner, "cores", lambda: 2)
+
+    calibration = calibrate(sha256_hash)
+    # chunks of pairs, not one task per hash: the dispatch cost is amortized
+    assert calibration.thread_speedup > 0.5
+    assert calibration.process_speedup is None
+
+    monkeypatch.setattr(planner, "PROCESSES", True)
+    calibration = calibrate(sha256_hash)
+    assert calibration.spawn_seconds > 0
+    assert calibration.process_speedup > 0
+    assert calibrate(sha256_hash) is calibration
+
+
+def test_from_levels_does_not_plan():
+    def hash_function(x: bytes, y: bytes) -> bytes:
+        return sha256(x + y).digest()
+
+    tree = MerkleTree(
+        [str(i) for i in range(5000)], sha256_hash, strategy=Strategy.SERIAL
+    )
+    loaded = MerkleTree.from_levels(tree.levels, hash_function)
+
+    assert loaded.root == tree.root
+    assert loaded.proof("7") == tree.proof("7")
+    assert loaded._plan is None
+    assert calibration_key(hash_function) not in CALIBRATIONS
+
+
+def test_forced_process(monkeypatch):
+    monkeypatch.setattr(planner, "cores", lambda: 4)
+
+    chosen = plan(5000, sha256_hash, Strategy.PROCESS)
+    assert chosen.strategy == Strategy.PROCESS
+    assert chosen.workers == 4
+    with raises(ValueError):
+        plan(5000, lambda x, y: x + y, Strategy.PROCESS)
+
+    monkeypatch.setattr(planner, "cores", lambda: 1)
+    assert plan(5000, sha256_hash, Strategy.PROCESS).strategy == Strategy.SERIAL
+
+
+def test_calibrations_are_shared_by_lambdas():
+    size = len(CALIBRATIONS)
+    for _ in range(5):
+        calibrate(lambda x, y: x + y)
+    calibrate(sha256_hash)
+    calibrate(sha256_hash)
+
+    assert len(CALIBRATIONS) <= size + 2
+
+
+def test_available_memory():
+    memory = available_memory()
+
+    assert memory is None or memory > 0
+
+
+def test_plan_is_logged(caplog):
+    with caplog.at_level(logging.DEBUG, logger="merkly.planner"):
+        chosen = plan(10, strategy=Strategy.SERIAL)
+
+    assert str(chosen) in caplog.text
+
+
+def test_root_from_iter():
+    for size in range(1, 20):
+        leaves = [str(i) for i in range(size)]
+        tree = MerkleTree(leaves if size > 1 else leaves * 2)
+        expected = tree.root if size > 1 else tree.leaves[0]
+        assert root_from_iter(iter(leaves)) == expected
+
+    with raises(ValueError):
+        root_from_iter([])
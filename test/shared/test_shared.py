@@ -0,0 +1,109 @@
+from concurrent.futures import ProcessPoolExecutor
+from merkly.cache import LeafHashCache
+from merkly.mtree import MerkleTree
+from merkly.padded import PaddedMerkleTree
+from merkly.shared import SharedLevels
+from pytest import raises
+import pickle
+import subprocess
+import sys
+
+LEAVES = [str(i) for i in range(11)]
+
+
+def test_pickle_default_tree():
+    tree = MerkleTree(LEAVES, cache=LeafHashCache("keccak"))
+    tree.root
+    copy = pickle.loads(pickle.dumps(tree))
+
+    assert copy.root == tree.root
+    assert copy.cache is None
+    assert copy.verify(copy.proof("3"), "3")
+
+
+def test_shared_levels():
+    tree = MerkleTree(LEAVES)
+    shared = SharedLevels.create(tree)
+    try:
+        attached = pickle.loads(pickle.dumps(shared))
+
+        assert attached.name == shared.name
+        assert attached.root == tree.root
+        for i, leaf in enumerate(LEAVES):
+            assert attached.index_proof(i) == tree.proof(leaf)
+        attached.close()
+    finally:
+        shared.close()
+
+
+def proof_in_worker(shared: SharedLevels, index: int):
+    try:
+        return [node.data for node in shared.index_proof(index)]
+    finally:
+        shared.close()
+
+
+def test_shared_levels_in_worker_processes():
+    tree = MerkleTree(LEAVES)
+    shared = SharedLevels.create(tree)
+    try:
+        with ProcessPoolExecutor(2) as pool:
+            proofs = list(pool.map(proof_in_worker, [shared] * 4, range(4)))
+    finally:
+        shared.close()
+
+    assert proofs == [[node.data for node in tree.proof(leaf)] for leaf in LEAVES[:4]]
+
+
+def test_shared_levels_sorted_pairs():
+    tree = MerkleTree(LEAVES, sort_pairs=True)
+    shared = SharedLevels.create(tree)
+    try:
+        assert shared.index_proof(5) == tree.proof("5")
+    finally:
+        shared.close()
+
+
+def test_shared_levels_errors():
+    with raises(ValueError):
+        SharedLevels.create(MerkleTree([b"a", b"bb", b"c"]))
+    with raises(ValueError):
+        SharedLevels.create(PaddedMerkleTree(LEAVES))
+
+
+def test_attach_from_independent_process():
+    tree = MerkleTree(LEAVES)
+    shared = SharedLevels.create(tree)
+    code = (
+        "import sys\n"
+        "from merkly.shared import SharedLevels\n"
+        "attached = SharedLevels.attach(sys.argv[1])\n"
+        "print(attached.root.hex())\n"
+        "attached.close()\n"
+    )
+    try:
+        for _ in range(2):
+            result = subprocess.run(
+                [sys.executable, "-c", code, shared.name],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            assert result.stdout.strip() == tree.root.hex()
+
+        attached = SharedLevels.attach(shared.name)
+        assert attached.root == tree.root
+        attached.close()
+    finally:
+        shared.close()
+
+
+def test_shared_levels_of_capped_tree():
+    tree = MerkleTree(LEAVES, cap_height=2)
+    shared = SharedLevels.create(tree)
+    try:
+        assert shared.cap_level == tree.cap_level
+        for i in range(len(LEAVES)):
+            assert shared.index_proof(i) == tree.index_proof(i)
+    finally:
+        shared.close()
@@ -0,0 +1,45 @@
+from merkly.mtree import MerkleTree
+from merkly.utils import keccak
+from merkly.verify import decode_proof, encode_proof, verify_sorted_proof
+from pytest import mark, raises
+
+
+def sorted_hash(x: bytes, y: bytes) -> bytes:
+    return keccak(min(x, y) + max(x, y))
+
+
+def test_sorted_pairs_root():
+    tree = MerkleTree(["a", "b", "c", "d", "e"], sort_pairs=True)
+    a, b, c, d, e = tree.leaves
+
+    expected = sorted_hash(sorted_hash(sorted_hash(a, b), sorted_hash(c, d)), e)
+    assert tree.root == expected
+
+
+@mark.parametrize("leaf", ["a", "b", "c", "d", "e", "f", "g"])
+def test_sorted_pairs_proof(leaf: str):
+    tree = MerkleTree(["a", "b", "c", "d", "e", "f", "g"], sort_pairs=True)
+    proof = tree.proof(leaf)
+
+    assert all(isinstance(sibling, bytes) for sibling in proof)
+    assert tree.verify(proof, leaf)
+    assert verify_sorted_proof(proof, leaf, tree.root.hex())
+    assert not verify_sorted_proof(proof, "z", tree.root)
+
+
+def test_encode_decode_proof():
+    tree = MerkleTree([str(i) for i in range(16)], sort_pairs=True)
+    proof = tree.proof("7")
+    data = encode_proof(proof)
+
+    assert len(data) == 4 * 32
+    assert decode_proof(data) == proof
+
+    with raises(ValueError):
+        decode_proof(data[:-1])
+
+
+def test_verify_proof_sort_pairs_kwarg():
+    tree = MerkleTree(["a", "b", "c", "d"], sort_pairs=True)
+
+    assert MerkleTree.verify_proof(tree.proof("c"), "c", tree.root, sort_pairs=True)
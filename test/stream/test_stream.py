@@ -0,0 +1,37 @@
+from merkly.mtree import MerkleTree
+from merkly.stream import proof_from_iter
+from pytest import mark, raises
+
+
+@mark.parametrize("size", [2, 3, 5, 6, 7, 8, 11, 16, 21])
+def test_proof_from_iter_matches_merkle_tree(size: int):
+    leaves = [str(i) for i in range(size)]
+    tree = MerkleTree(leaves, lambda x, y: x + y)
+
+    for i, leaf in enumerate(leaves):
+        proof = proof_from_iter(iter(leaves), i, lambda x, y: x + y)
+        assert proof == tree.proof(leaf)
+        assert [node.side for node in proof] == [node.side for node in tree.proof(leaf)]
+
+
+def test_proof_from_iter_many_indexes():
+    leaves = [str(i) for i in range(10)]
+    tree = MerkleTree(leaves)
+
+    proofs = proof_from_iter((leaf for leaf in leaves), [0, 4, 9])
+    assert set(proofs) == {0, 4, 9}
+    for i, proof in proofs.items():
+        assert tree.verify(proof, leaves[i])
+
+
+def test_proof_from_iter_hashed_leaves():
+    tree = MerkleTree([str(i) for i in range(6)])
+
+    assert proof_from_iter(tree.leaves, 5) == tree.proof("5")
+
+
+def test_proof_from_iter_errors():
+    with raises(IndexError):
+        proof_from_iter(["a", "b", "c"], 3)
+    with raises(Exception):
+        proof_from_iter(["a"], 0)
@@ -0,0 +1,91 @@
+from merkly.mtree import MerkleTree
+from merkly.verify import verify_proof
+from pytest import mark
+import subprocess
+import sys
+
+# maximum time to `import merkly.verify` in a fresh interpreter, on a runner
+# where `import json` takes `BASELINE_MS`; slower runners get a larger budget
+IMPORT_BUDGET_MS = 50
+BASELINE_MS = 5
+ATTEMPTS = 3
+
+
+def import_ms(module: str) -> float:
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print((time.perf_counter() - start) * 1000)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return float(result.stdout)
+
+
+def test_verify_import_budget():
+    # best of a few runs, against a baseline measured in the same run
+    elapsed = min(import_ms("merkly.verify") for _ in range(ATTEMPTS))
+    baseline = min(import_ms("json") for _ in range(ATTEMPTS))
+
+    assert elapsed < IMPORT_BUDGET_MS * max(1.0, baseline / BASELINE_MS)
+
+
+def test_verify_import_is_lazy():
+    code = "import sys, merkly.verify; print('pydantic' in sys.modules, 'keccaky' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "False False"
+
+
+def test_mtree_import_is_lazy():
+    code = (
+        "import sys, merkly.mtree\n"
+        "print('pydantic' in sys.modules, 'keccaky' in sys.modules, "
+        "'multiprocessing' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "False False False"
+
+
+@mark.parametrize("leaf", ["a", "b", "c", "d", "e"])
+def test_verify_proof(leaf: str):
+    tree = MerkleTree(["a", "b", "c", "d", "e"])
+
+    assert verify_proof(tree.proof(leaf), leaf, tree.root.hex())
+    assert not verify_proof(tree.proof(leaf), "z", tree.root.hex())
+
+
+def test_verify_proof_with_hash_function():
+    tree = MerkleTree(["a", "b", "c", "d"], lambda x, y: x + y)
+
+    assert verify_proof(tree.proof("c"), "c", b"abcd".hex(), lambda x, y: x + y)
+
+
+def test_verify_proof_root_and_leaf_forms():
+    tree = MerkleTree(["a", "b", "c", "d"])
+    proof = tree.proof("b")
+    leaf = tree.leaves[1]
+
+    assert verify_proof(proof, "b", tree.root)
+    assert verify_proof(proof, leaf, tree.root)
+    assert verify_proof(proof, leaf, "0x" + tree.root.hex())
+    assert not verify_proof(proof, leaf, "not hexadecimal")
+    assert MerkleTree.verify_proof(proof, leaf, tree.root)
+
+
+def test_verify_uses_cached_root():
+    tree = MerkleTree(["a", "b", "c", "d"])
+    proof = tree.proof("b")
+
+    assert tree.verify(proof, "b")
+    assert tree.verify(proof, tree.leaves[1])
+
+    tree.leaves = tree.leaves[:2]
+    assert not tree.verify(proof, "b")